@@ -0,0 +1,177 @@
+import argparse
+import json
+import os
+import re
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import vg_class
+from tools.generate import TS_KIND_LIST, generate_series
+from tools.save import save_dir
+
+script_name = re.sub(r"\.py$", "", os.path.basename(__file__))
+
+GRAPH_CLASS_LIST = [
+    "VisibilityGraph",
+    "InvisibilityGraph",
+    "EfficientVisibilityGraph",
+    "HorizontalVisibilityGraph",
+    "RiseVisibilityGraph",
+    "RiseInvisibilityGraph",
+    "FallVisibilityGraph",
+    "FallInvisibilityGraph",
+    "RefinedVG",
+]
+# These graphs are only defined for a finite window_width.
+WINDOWED_GRAPH_CLASS_LIST = GRAPH_CLASS_LIST[4:]
+OMEGA_LIST = [2, 10, 100, None]
+KEY_COLUMNS = ["graph", "omega", "ts_kind", "N"]
+# The collinear points of a ramp are the worst case of VisibilityGraph and
+# InvisibilityGraph without omega, see vg_class._edges.natural_vg_edges.
+BENCHMARK_TS_KIND_LIST = TS_KIND_LIST + ["Linear ramp"]
+
+
+def main(
+    min_power_idx=8,
+    max_power_idx=16,
+    graph_list=None,
+    omega_list=None,
+    ts_kind_list=None,
+    repeat=3,
+    timeout=600,
+    baseline_path=None,
+    save_baseline=False,
+):
+    """Benchmarks the construction and the TIR of the graphs, each case in a subprocess.
+
+    Every case builds graph_class(series, name, omega) from generate_series(ts_kind, N),
+    or from a linear ramp, and computes compute_irreversibility(). The times are the best
+    of repeat runs and peak_rss is the maximum resident set size of the subprocess.
+    """
+    result = pd.DataFrame(
+        [
+            run_case_in_subprocess(graph, omega, ts_kind, 2 ** power_idx, repeat, timeout)
+            for graph in graph_list or GRAPH_CLASS_LIST
+            for omega in omega_list or OMEGA_LIST
+            if omega is not None or graph not in WINDOWED_GRAPH_CLASS_LIST
+            for ts_kind in ts_kind_list or BENCHMARK_TS_KIND_LIST
+            for power_idx in range(min_power_idx, max_power_idx + 1)
+        ]
+    )
+    output_dir = save_dir(script_name)
+    if baseline_path is not None:
+        result = compare_with_baseline(result, baseline_path)
+    result.to_csv(f"{output_dir}/benchmark_result.csv", index=False)
+    scaling_table = get_scaling_table(result)
+    scaling_table.to_csv(f"{output_dir}/scaling_table.csv")
+    print(scaling_table.to_string())
+    if save_baseline:
+        result[KEY_COLUMNS + ["construction_time", "tir_time", "peak_rss"]].to_json(
+            f"{output_dir}/baseline.json", orient="records", indent=2
+        )
+
+
+def run_case_in_subprocess(graph, omega, ts_kind, N, repeat, timeout):
+    case = {"graph": graph, "omega": omega, "ts_kind": ts_kind, "N": N}
+    command = [sys.executable, __file__, "--case", json.dumps({**case, "repeat": repeat})]
+    try:
+        output = subprocess.run(
+            command, capture_output=True, check=True, text=True, timeout=timeout
+        ).stdout
+        result = json.loads(output.splitlines()[-1])
+    except (subprocess.TimeoutExpired, subprocess.CalledProcessError) as e:
+        print(f"{case} failed: {type(e).__name__}")
+        result = {"construction_time": np.nan, "tir_time": np.nan, "peak_rss": np.nan}
+    print(f"{case}: {result}")
+    # omega is kept as a label, so that None survives the CSV and JSON files.
+    return {**case, "omega": str(omega), **result}
+
+
+def run_case(graph, omega, ts_kind, N, repeat):
+    graph_class = getattr(vg_class, graph)
+    if ts_kind == "Linear ramp":
+        ts = np.linspace(0, 1, N)
+    else:
+        ts = generate_series(ts_kind, N)
+    construction_time_list, tir_time_list = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        g = graph_class(ts, "", omega).build()
+        construction_time_list.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        tir = g.compute_irreversibility()
+        tir_time_list.append(time.perf_counter() - start)
+        del g
+    return {
+        "construction_time": min(construction_time_list),
+        "tir_time": min(tir_time_list),
+        # ru_maxrss is in KiB on Linux.
+        "peak_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "tir": float(tir),
+    }
+
+
+def compare_with_baseline(result, baseline_path):
+    """Adds the ratio of each metric to the baseline, i.e. > 1 is a slowdown."""
+    baseline = pd.read_json(baseline_path, orient="records", dtype={"omega": str})
+    merged = result.merge(baseline, on=KEY_COLUMNS, how="left", suffixes=("", "_baseline"))
+    for metric in ["construction_time", "tir_time", "peak_rss"]:
+        merged[f"{metric}_ratio"] = merged[metric] / merged[f"{metric}_baseline"]
+    return merged
+
+
+def get_scaling_table(result):
+    """Median construction time of each N, and its exponent in N from a log-log fit."""
+    table = result.pivot_table(
+        index=["graph", "omega"], columns="N", values="construction_time", aggfunc="median"
+    )
+    n_array = np.log(table.columns.values.astype(np.float64))
+    table["exponent"] = [
+        np.polyfit(n_array[np.isfinite(row)], row[np.isfinite(row)], 1)[0]
+        if np.sum(np.isfinite(row)) > 1
+        else np.nan
+        for row in np.log(table.values)
+    ]
+    return table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--case", help="run a single case as json and print its result")
+    parser.add_argument("--min-power-idx", type=int, default=8)
+    parser.add_argument("--max-power-idx", type=int, default=16)
+    parser.add_argument("--graph", nargs="+", choices=GRAPH_CLASS_LIST, default=None)
+    parser.add_argument(
+        "--omega",
+        nargs="+",
+        type=lambda omega: None if omega == "None" else int(omega),
+        default=None,
+        help="window widths, e.g. --omega 2 10 None",
+    )
+    parser.add_argument("--ts-kind", nargs="+", choices=BENCHMARK_TS_KIND_LIST, default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=600, help="seconds per case")
+    parser.add_argument("--baseline", default=None, help="baseline.json to compare with")
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="store this run as baseline.json"
+    )
+    args = parser.parse_args()
+    if args.case is not None:
+        print(json.dumps(run_case(**json.loads(args.case))))
+    else:
+        main(
+            args.min_power_idx,
+            args.max_power_idx,
+            args.graph,
+            args.omega,
+            args.ts_kind,
+            args.repeat,
+            args.timeout,
+            args.baseline,
+            args.save_baseline,
+        )
@@ -1,8 +1,11 @@
 #!/bin/sh
+# Each configuration runs its (kind, seed) tasks on a process pool.
+# Set N_WORKERS to limit the number of processes (all cores by default).
+N_WORKERS_OPT=${N_WORKERS:+--n-workers $N_WORKERS}
 
 # VG
-python monte_carlo_vg.py
+python monte_carlo_vg.py $N_WORKERS_OPT
 # LVG
-python monte_carlo_vg.py --omega 100
+python monte_carlo_vg.py --omega 100 $N_WORKERS_OPT
 # DVG
-python monte_carlo_dvg.py --omega 2
+python monte_carlo_dv-vg.py --omega 2 $N_WORKERS_OPT
@@ -1,47 +1,48 @@
+import argparse
 import os
 import re
 
 import pandas as pd
 
+from tools.cache import DegreeCache
+from tools.market_data import load_prices, resolve_tickers, update_price_store
 from tools.save import save_dir
 from vg_class import RefinedVG
 
 script_name = re.sub(r"\.py$", "", os.path.basename(__file__))
 
 
-def main():
-    market_list = ["N225", "BSESN", "HSI", "FCHI", "DJI", "GDAXI"]
+def main(market_list=None):
+    market_list = resolve_tickers(market_list)
+    update_price_store(market_list)
     period_length = 1000
+    cache = DegreeCache()
     for market in market_list:
-        result = get_deg_vec_tir_seq(market, period_length)
+        result = get_deg_vec_tir_seq(market, period_length, cache)
         result.to_csv(f"{save_dir(script_name)}/{market}_dv-vg_tir.csv")
 
 
-def get_deg_vec_tir_seq(market, period_length):
-    market_data = (
-        pd.read_csv(
-            f"../data/daily_stock_prices/{market}.csv",
-            usecols=["Date", "Close"],
-            parse_dates=["Date"],
-        )
-        .dropna()
-        .rename(columns={"Close": "Price"})
-        .set_index("Date")
-    )
+def get_deg_vec_tir_seq(market, period_length, cache=None):
+    dates, prices = load_prices(market)
+    market_data = pd.DataFrame({"Price": prices}, index=pd.DatetimeIndex(dates, name="Date"))
+    # The memory-mapped prices are passed to RefinedVG without a copy.
     rvg = RefinedVG(
-        time_series=market_data.Price.values, name=f"{market}-Refined-VG", window_width=2
-    )
-    tir_seq = pd.Series(
-        {
-            market_data.index[i - 2 + period_length]: rvg.compute_irreversibility(
-                start=i, end=i + period_length
-            )
-            for i in range(1, rvg.N - period_length + 2)
-        },
-        name="TIR",
+        time_series=prices,
+        name=f"{market}-Refined-VG",
+        window_width=2,
+        cache=cache,
     )
+    tir_seq = rvg.rolling_irreversibility(period_length, index=market_data.index)
     return market_data.join(tir_seq)
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--tickers",
+        nargs="+",
+        default=None,
+        help="tickers or glob patterns of daily_stock_prices (the six indices by default)",
+    )
+    args = parser.parse_args()
+    main(args.tickers)
@@ -0,0 +1,47 @@
+import argparse
+import itertools
+import os
+import re
+import time
+
+from tools.market_data import resolve_tickers, update_price_store
+from tools.save import save_dir
+from tools.universe_tir import run_universe_tir
+
+script_name = re.sub(r"\.py$", "", os.path.basename(__file__))
+
+
+def main(market_list, omega_list, period_length_list, n_workers=None, file_format="csv"):
+    start = time.time()
+    market_list = resolve_tickers(market_list)
+    update_price_store(market_list)
+    config_list = list(itertools.product(omega_list, period_length_list))
+    result = run_universe_tir(market_list, config_list, n_workers)
+    file_path = f"{save_dir(script_name)}/dv-vg_rolling_tir.{file_format}"
+    if file_format == "parquet":
+        result.to_parquet(file_path, index=False)
+    else:
+        result.to_csv(file_path, index=False)
+    elapsed_time = time.time() - start
+    print(f"elapsed_time: {elapsed_time}[sec]")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--tickers",
+        nargs="+",
+        default=None,
+        help="tickers or glob patterns of daily_stock_prices (the six indices by default)",
+    )
+    parser.add_argument("--omega", nargs="+", type=int, default=[2])
+    parser.add_argument("--period-length", nargs="+", type=int, default=[1000])
+    parser.add_argument(
+        "--n-workers",
+        type=int,
+        default=None,
+        help="number of worker processes (all cores by default, 1 runs serially)",
+    )
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    args = parser.parse_args()
+    main(args.tickers, args.omega, args.period_length, args.n_workers, args.format)
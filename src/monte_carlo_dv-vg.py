@@ -3,15 +3,14 @@ import os
 import re
 import time
 
-import pandas as pd
-from tools.convenient_functions import generate_ts
+from tools.monte_carlo import run_prefix_tir_mc
 from tools.save import save_dir
-from vg_class import RefinedSubGraph, RefinedVG
+from vg_class import RefinedVG
 
 script_name = re.sub(r"\.py$", "", os.path.basename(__file__))
 
 
-def main(omega):
+def main(omega, n_workers=None):
     start = time.time()
     ts_kind_list = [
         "White noise",
@@ -25,21 +24,10 @@ def main(omega):
     ]
     n_iter = 10
     max_power_idx = 16
-    for i, ts_kind in enumerate(ts_kind_list, 1):
-        whole_graph_list = [
-            RefinedVG(
-                generate_ts(kind=ts_kind, size=2 ** max_power_idx, seed=i),
-                "",
-                omega,
-            )
-            for i in range(n_iter)
-        ]
-        result_df = pd.DataFrame(
-            {
-                N: [RefinedSubGraph(vg, N).compute_irreversibility() for vg in whole_graph_list]
-                for N in [2 ** i for i in range(5, max_power_idx + 1)]
-            }
-        )
+    result_df_dict = run_prefix_tir_mc(
+        RefinedVG, ts_kind_list, omega, n_iter, max_power_idx, n_workers
+    )
+    for ts_kind, result_df in result_df_dict.items():
         result_df.to_csv(f"{save_dir(script_name)}" f"/dvg-{omega}_mc_result_{ts_kind}.csv")
         print(f"{ts_kind} has been finished")
     elapsed_time = time.time() - start
@@ -52,6 +40,11 @@ if __name__ == "__main__":
         "--omega",
         type=int,
     )
+    parser.add_argument(
+        "--n-workers",
+        type=int,
+        default=None,
+        help="number of worker processes (all cores by default, 1 runs serially)",
+    )
     args = parser.parse_args()
-    omega = args.omega
-    main(omega)
+    main(args.omega, args.n_workers)
@@ -2,17 +2,15 @@ import argparse
 import os
 import re
 import time
-from collections import defaultdict
 
-import pandas as pd
-from tools.convenient_functions import generate_ts
+from tools.monte_carlo import run_prefix_tir_mc
 from tools.save import save_dir
-from vg_class import BasicSubGraph, EfficientVisibilityGraph
+from vg_class import EfficientVisibilityGraph
 
 script_name = re.sub(r"\.py$", "", os.path.basename(__file__))
 
 
-def main(omega):
+def main(omega, n_workers=None):
     start = time.time()
     ts_kind_list = [
         "White noise",
@@ -26,18 +24,11 @@ def main(omega):
     ]
     n_iter = 10
     max_power_idx = 16  # max size of the time series will be 2**max_power_idx
-    for ts_kind in ts_kind_list:
-        result_dict = defaultdict(list)
-        for i in range(n_iter):
-            print(i)
-            vg = EfficientVisibilityGraph(
-                generate_ts(kind=ts_kind, size=2 ** max_power_idx, seed=i),
-                name="",
-                window_width=omega,
-            )
-            for N in [2 ** j for j in range(5, max_power_idx + 1)]:
-                result_dict[N].append(BasicSubGraph(vg, N).compute_irreversibility())
-        result_df = pd.DataFrame(result_dict)
+    # Every (kind, seed) runs on the process pool and regenerates its series from the seed.
+    result_df_dict = run_prefix_tir_mc(
+        EfficientVisibilityGraph, ts_kind_list, omega, n_iter, max_power_idx, n_workers
+    )
+    for ts_kind, result_df in result_df_dict.items():
         result_df.to_csv(f"{save_dir(script_name)}/vg-{omega}_mc_result_{ts_kind}.csv")
         print(f"{ts_kind} has been finished.")
     elapsed_time = time.time() - start
@@ -51,6 +42,11 @@ if __name__ == "__main__":
         type=int,
         default=None,
     )
+    parser.add_argument(
+        "--n-workers",
+        type=int,
+        default=None,
+        help="number of worker processes (all cores by default, 1 runs serially)",
+    )
     args = parser.parse_args()
-    omega = args.omega
-    main(omega)
+    main(args.omega, args.n_workers)
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from vg_class._edges import EDGE_KINDS, natural_vg_edges, rise_fall_edges
+
+rng = np.random.default_rng(0)
+# Collinear and tick-rounded points are where the ties have to be resolved as the line test.
+SERIES = {
+    "one-decimal walk": np.round(10 + 0.1 * np.cumsum(rng.integers(-2, 3, 120)), 1),
+    "two-decimal drift walk": np.round(100 + 0.01 * np.cumsum(rng.integers(-2, 4, 120)), 2),
+    "linear ramp": np.linspace(0, 1, 120),
+    "integers": rng.integers(0, 4, 120).astype(np.float64),
+    "white noise": rng.uniform(0, 1, 120),
+    "three points": np.array([0.1, 0.2, 0.1 * 3]),
+}
+
+
+def line_test_edges(values, window_width, invisible):
+    """Edges of the (in)visibility graph from the line test of every pair, as the former loops."""
+    y = np.asarray(values, dtype=np.float64).tolist()
+    n = len(y)
+    edges = []
+    for ta in range(n):
+        tb_max = n if window_width is None else min(n, ta + window_width + 1)
+        for tb in range(ta + 1, tb_max):
+            slope = (y[tb] - y[ta]) / (tb - ta)
+            line = [y[ta] + slope * (tc - ta) for tc in range(ta + 1, tb)]
+            if invisible:
+                hidden = any(yc <= yl for yc, yl in zip(y[ta + 1 : tb], line))
+            else:
+                hidden = any(yc >= yl for yc, yl in zip(y[ta + 1 : tb], line))
+            if not hidden:
+                edges.append((ta + 1, tb + 1))
+    return edges
+
+
+@pytest.mark.parametrize("name", SERIES)
+@pytest.mark.parametrize("window_width", [2, 7, None])
+@pytest.mark.parametrize("invisible", [False, True])
+def test_natural_vg_edges_match_line_test(name, window_width, invisible):
+    source, target = natural_vg_edges(SERIES[name], window_width, invisible)
+    edges = list(zip(source.tolist(), target.tolist()))
+    assert edges == line_test_edges(SERIES[name], window_width, invisible)
+
+
+def line_test_rise_fall_edges(values, window_width):
+    """Edges of the four rise/fall (in)visibility graphs from the line test of every pair."""
+    y = np.asarray(values, dtype=np.float64).tolist()
+    n = len(y)
+    edges = []
+    for ta in range(n):
+        for tb in range(ta + 1, min(n, ta + window_width + 1)):
+            slope = (y[tb] - y[ta]) / (tb - ta)
+            line = [y[ta] + slope * (tc - ta) for tc in range(ta + 1, tb)]
+            between = list(zip(y[ta + 1 : tb], line))
+            isVisible = not any(yc >= yl for yc, yl in between)
+            isInvisible = not any(yc <= yl for yc, yl in between)
+            prefix = "R" if y[ta] < y[tb] else "F" if y[ta] > y[tb] else None
+            if prefix is None:
+                continue
+            for kind, connect in [(prefix + "V", isVisible), (prefix + "IV", isInvisible)]:
+                if connect:
+                    edges.append((ta + 1, tb + 1, EDGE_KINDS.index(kind)))
+    return sorted(edges)
+
+
+@pytest.mark.parametrize("name", SERIES)
+@pytest.mark.parametrize("window_width", [2, 7, 30])
+def test_rise_fall_edges_match_line_test(name, window_width):
+    source, target, kind = rise_fall_edges(SERIES[name], window_width)
+    edges = sorted(zip(source.tolist(), target.tolist(), kind.tolist()))
+    assert edges == line_test_rise_fall_edges(SERIES[name], window_width)
@@ -0,0 +1,63 @@
+import glob
+import hashlib
+import os
+
+import numpy as np
+
+from tools.save import repo_path
+
+
+class DegreeCache:
+    def __init__(self, cache_dir=None, max_bytes=2 ** 30):
+        """On-disk cache of the arrays of a graph, i.e. its edges and degree vectors.
+
+        An entry is a compressed .npz file keyed by a content hash of the time series,
+        the graph type and window_width. Loading an entry refreshes its modification
+        time, and the least recently used entries are evicted beyond max_bytes.
+
+        Args:
+            cache_dir (str):
+                Directory of the cache, output/degree_cache by default.
+            max_bytes (int):
+                Maximum total size of the cache.
+        """
+        if cache_dir is None:
+            cache_dir = repo_path("output/degree_cache")
+        os.makedirs(cache_dir, exist_ok=True)
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def get_path(self, time_series, graph_type, window_width):
+        values = np.ascontiguousarray(time_series, dtype=np.float64)
+        digest = hashlib.sha1(values.tobytes()).hexdigest()
+        return os.path.join(self.cache_dir, f"{graph_type}-{window_width}-{digest}.npz")
+
+    def load(self, time_series, graph_type, window_width):
+        """Returns the cached arrays as a dict, or None if they are not cached."""
+        path = self.get_path(time_series, graph_type, window_width)
+        try:
+            with np.load(path) as npz:
+                arrays = {name: npz[name] for name in npz.files}
+        except (FileNotFoundError, OSError, ValueError):
+            return None
+        os.utime(path)
+        return arrays
+
+    def save(self, time_series, graph_type, window_width, **arrays):
+        path = self.get_path(time_series, graph_type, window_width)
+        # Write to a temporary file first so that a concurrent reader never sees a partial entry.
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self):
+        path_list = sorted(
+            glob.glob(os.path.join(self.cache_dir, "*.npz")), key=os.path.getmtime, reverse=True
+        )
+        total_bytes = 0
+        for path in path_list:
+            total_bytes += os.path.getsize(path)
+            if total_bytes > self.max_bytes:
+                os.remove(path)
@@ -2,7 +2,11 @@ from collections import defaultdict
 
 import numpy as np
 
+from tools.generate import generate_series
+from tools.profiling import profiled
 
+
+@profiled("KLD")
 def KLD(p_cnt, q_cnt, delta=1e-10):
     """
     Args:
@@ -13,77 +17,109 @@ def KLD(p_cnt, q_cnt, delta=1e-10):
         delta (float):
             value to complement zero.
     """
-    p_sum = sum(p_cnt.values())
-    p_dist = {k: v / p_sum for k, v in p_cnt.items()}
-    q_sum = sum(q_cnt.values())
-    q_cnt = {k: v / q_sum for k, v in q_cnt.items()}
-    q_dist = defaultdict(lambda: 0)
-    q_dist.update(q_cnt)
-    div_list = [
-        p_proba * np.log((p_proba + delta) / (q_dist[k] + delta)) for k, p_proba in p_dist.items()
-    ]
-    kld = sum(div_list)
+    keys = list(p_cnt.keys()) + [k for k in q_cnt.keys() if k not in p_cnt]
+    kld = array_KLD(
+        [p_cnt.get(k, 0) for k in keys], [q_cnt.get(k, 0) for k in keys], delta=delta
+    )
     return kld
 
 
+def array_KLD(p_cnt, q_cnt, delta=1e-10):
+    """KLD of histograms given as count arrays aligned on the same keys.
+
+    The terms are summed one by one in the order of the keys as KLD does,
+    so keys with zero count in p_cnt never change the result. A histogram
+    whose counts sum to 0 has zero probabilities, e.g. an empty p_cnt gives 0.
+
+    Args:
+        p_cnt, q_cnt (array-like object):
+            counts of each key along the last axis.
+            A 2-D array holds one histogram per row, e.g. one per window or seed.
+        delta (float):
+            value to complement zero.
+    Returns:
+        float or numpy.ndarray: KLD of each histogram.
+    """
+    p_cnt = np.asarray(p_cnt, dtype=np.float64)
+    q_cnt = np.asarray(q_cnt, dtype=np.float64)
+    p_sum = p_cnt.sum(axis=-1, keepdims=True)
+    q_sum = q_cnt.sum(axis=-1, keepdims=True)
+    p_dist = np.divide(p_cnt, p_sum, out=np.zeros_like(p_cnt), where=p_sum > 0)
+    q_dist = np.divide(q_cnt, q_sum, out=np.zeros_like(q_cnt), where=q_sum > 0)
+    div_array = np.where(p_dist > 0, p_dist * np.log((p_dist + delta) / (q_dist + delta)), 0.0)
+    if div_array.shape[-1] == 0:
+        return div_array.sum(axis=-1)
+    kld = np.cumsum(div_array, axis=-1)[..., -1]
+    # Returns a scalar rather than a 0-d array for a single histogram.
+    return kld[()]
+
+
+def aligned_counts(p_keys, q_keys):
+    """Counts the keys of each row into histograms aligned on the same columns.
+
+    Args:
+        p_keys, q_keys (array-like object):
+            keys of shape (n_hist, n_p) and (n_hist, n_q), e.g. pattern codes.
+            1-D arrays are taken as a single histogram.
+    Returns:
+        tuple of numpy.ndarray:
+            (p_cnt, q_cnt) of shape (n_hist, n_keys), ready for array_KLD.
+            The columns follow the sorted union of the keys.
+    """
+    p_keys = np.atleast_2d(p_keys)
+    q_keys = np.atleast_2d(q_keys)
+    n_hist, n_p = p_keys.shape
+    all_keys = np.concatenate([p_keys, q_keys], axis=1)
+    unique_keys, inverse = np.unique(all_keys.ravel(), return_inverse=True)
+    n_keys = len(unique_keys)
+    inverse = inverse.reshape(all_keys.shape) + n_keys * np.arange(n_hist)[:, None]
+    p_cnt = np.bincount(inverse[:, :n_p].ravel(), minlength=n_hist * n_keys)
+    q_cnt = np.bincount(inverse[:, n_p:].ravel(), minlength=n_hist * n_keys)
+    return p_cnt.reshape(n_hist, n_keys), q_cnt.reshape(n_hist, n_keys)
+
+
+class RollingKLD:
+    """KLD of two histograms which slide while keeping their totals.
+
+    Only the terms of the updated keys are recomputed,
+    so that each update of the histograms costs O(1).
+
+    Args:
+        p_sum, q_sum (int):
+            Total counts of the two histograms.
+        delta (float):
+            value to complement zero.
+    """
+
+    def __init__(self, p_sum, q_sum, delta=1e-10):
+        self.p_sum = p_sum
+        self.q_sum = q_sum
+        self.delta = delta
+        self.p_cnt = defaultdict(lambda: 0)
+        self.q_cnt = defaultdict(lambda: 0)
+        self.value = 0.0
+
+    def term(self, key):
+        p_proba = self.p_cnt[key] / self.p_sum
+        if p_proba == 0:
+            return 0.0
+        q_proba = self.q_cnt[key] / self.q_sum
+        return p_proba * np.log((p_proba + self.delta) / (q_proba + self.delta))
+
+    def update(self, key, p_diff=0, q_diff=0):
+        self.value -= self.term(key)
+        self.p_cnt[key] += p_diff
+        self.q_cnt[key] += q_diff
+        self.value += self.term(key)
+
+
 def generate_ts(kind, size, seed=42):
-    np.random.seed(seed)
-    if kind == "White noise":
-        ts = np.random.uniform(0, 1, size)
-    elif kind == "Chaotic logistic map":
-        x0 = np.random.uniform(0, 1)
-        ts = [x0]
-        for i in range(size - 1):
-            x = ts[i]
-            ts.append(4 * x * (1 - x))
-    elif kind == "Unbiased additive random walk":
-        ts = np.cumsum(np.random.uniform(low=-0.5, high=0.5, size=size))
-    elif kind == "Additive random walk with positive drift":
-        np.random.seed(seed + 100)
-        ts = np.cumsum(np.random.uniform(low=-0.4, high=0.6, size=size))
-    elif kind == "Unbiased additive random walk with memory":
-        r = 0.3
-        tau = 6
-        ts = np.cumsum(np.random.uniform(-0.5, 0.5, tau))
-        for i in range(tau, size):
-            p = np.random.uniform()
-            if p > r:
-                x_before = ts[i - 1]
-                xi = np.random.uniform(-0.5, 0.5)
-                ts = np.append(ts, x_before + xi)
-            else:
-                memory = ts[i - tau]
-                ts = np.append(ts, memory)
-    elif kind == "Unbiased multiplicative random walk":
-        ts = np.cumprod(np.append([1], np.exp(np.random.uniform(-0.5, 0.5, size - 1))))
-    elif kind == "Multiplicative random walk with negative drift":
-        ts = np.cumprod(np.append([1], np.random.uniform(0.9, 1.1, size - 1)))
-    elif kind == "Multiplicative random walk with volatility clustering (GARCH)":
-        gamma = 0.1
-        # gamma = 0.045
-        beta = 0.6
-        # beta = 0.87
-        alpha = 0.3
-        # alpha = 0.11
-        y = [0 for _ in range(size)]
-        h = [1 for _ in range(size)]
-        for t in range(1, size):
-            h[t] = gamma + beta * h[t - 1] + alpha * (y[t - 1] ** 2)
-            y[t] = np.sqrt(h[t]) * np.random.normal(0, 1)
-        y = [num / 100 for num in y]
-        ts = np.cumprod(np.exp(y))
-    else:
-        error_message = (
-            "Arg 'kind' must be one of the folloing.\n'White noise',\n"
-            "'Chaotic logistic map',\n'Unbiased additive random walk',\n"
-            "'Additive random walk with positive drift',\n"
-            "'Unbiased additive random walk with memory',\n"
-            "'Unbiased multiplicative random walk',\n"
-            "'Multiplicative random walk with negative drift' ,\n."
-            "'GARCH'."
-        )
-        raise ValueError(error_message)
-    return ts
+    """Generates the synthetic time series of np.random.seed(seed) as it always has.
+
+    See tools.generate for the bulk-drawing generators this relies on,
+    including the numpy.random.Generator streams and the batch mode.
+    """
+    return generate_series(kind, size, seed=seed, legacy=True)
 
 
 def nested_dict():
@@ -0,0 +1,197 @@
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+TS_KIND_LIST = [
+    "White noise",
+    "Chaotic logistic map",
+    "Unbiased additive random walk",
+    "Additive random walk with positive drift",
+    "Unbiased additive random walk with memory",
+    "Unbiased multiplicative random walk",
+    "Multiplicative random walk with negative drift",
+    "Multiplicative random walk with volatility clustering (GARCH)",
+]
+
+
+def _jit(func):
+    """Compiles the recurrence with Numba if it is installed, otherwise runs it on NumPy."""
+    if njit is None:
+        return func
+    return njit(cache=True)(func)
+
+
+def generate_series(kind, size, seed=42, legacy=False):
+    """Generates a synthetic time series.
+
+    Args:
+        kind (str):
+            One of TS_KIND_LIST.
+        size (int):
+            Length of the time series.
+        seed (int):
+            Seed of the random numbers.
+        legacy (bool):
+            If True, the random numbers are drawn from np.random.seed(seed)
+            and the series is exactly the one the former loop-based generate_ts
+            produced. Otherwise they are drawn from np.random.default_rng(seed).
+            Either way the same draws are used in the same order, i.e. the kind
+            'Additive random walk with positive drift' uses seed + 100.
+    Returns:
+        numpy.ndarray: time series of shape (size,).
+    """
+    return generate_series_batch(kind, size, [seed], legacy=legacy)[0]
+
+
+def generate_series_batch(kind, size, seeds, legacy=False):
+    """Generates one synthetic time series per seed, advancing all of them together.
+
+    Each row is generate_series(kind, size, seed, legacy) for its seed.
+    The random numbers of each seed are drawn in bulk and the recurrences
+    run over the time steps with all the series at once.
+
+    Args:
+        kind (str):
+            One of TS_KIND_LIST.
+        size (int):
+            Length of each time series.
+        seeds (int or list of int):
+            Seeds of the series, or the number of series for seeds 0, 1, ...
+        legacy (bool):
+            See generate_series.
+    Returns:
+        numpy.ndarray: time series of shape (len(seeds), size).
+    """
+    if isinstance(seeds, int):
+        seeds = range(seeds)
+    if kind == "White noise":
+        ts = _stack_draws(seeds, legacy, lambda rs: rs.uniform(0, 1, size))
+    elif kind == "Chaotic logistic map":
+        ts = np.empty((size, len(seeds)))
+        ts[0] = _stack_draws(seeds, legacy, lambda rs: rs.uniform(0, 1, 1))[0]
+        ts = _logistic_map(ts)
+    elif kind == "Unbiased additive random walk":
+        ts = np.cumsum(_stack_draws(seeds, legacy, lambda rs: rs.uniform(-0.5, 0.5, size)), axis=0)
+    elif kind == "Additive random walk with positive drift":
+        seeds = [seed + 100 for seed in seeds]
+        ts = np.cumsum(_stack_draws(seeds, legacy, lambda rs: rs.uniform(-0.4, 0.6, size)), axis=0)
+    elif kind == "Unbiased additive random walk with memory":
+        ts = _random_walk_with_memory(size, seeds, legacy)
+    elif kind == "Unbiased multiplicative random walk":
+        step = np.exp(_stack_draws(seeds, legacy, lambda rs: rs.uniform(-0.5, 0.5, size - 1)))
+        ts = np.cumprod(np.concatenate([np.ones((1, len(seeds))), step]), axis=0)
+    elif kind == "Multiplicative random walk with negative drift":
+        step = _stack_draws(seeds, legacy, lambda rs: rs.uniform(0.9, 1.1, size - 1))
+        ts = np.cumprod(np.concatenate([np.ones((1, len(seeds))), step]), axis=0)
+    elif kind == "Multiplicative random walk with volatility clustering (GARCH)":
+        ts = simulate_garch(0.1, 0.3, 0.6, size, seeds, legacy=legacy).T
+    else:
+        error_message = (
+            "Arg 'kind' must be one of the folloing.\n'White noise',\n"
+            "'Chaotic logistic map',\n'Unbiased additive random walk',\n"
+            "'Additive random walk with positive drift',\n"
+            "'Unbiased additive random walk with memory',\n"
+            "'Unbiased multiplicative random walk',\n"
+            "'Multiplicative random walk with negative drift' ,\n."
+            "'GARCH'."
+        )
+        raise ValueError(error_message)
+    return np.ascontiguousarray(ts.T)
+
+
+def simulate_garch(gamma, alpha, beta, size, seeds, legacy=False):
+    """Simulates the prices of GARCH(1, 1) log-returns (in percent), one path per seed.
+
+    Args:
+        gamma, alpha, beta (float):
+            Parameters of h[t] = gamma + beta * h[t - 1] + alpha * y[t - 1] ** 2.
+        size (int):
+            Length of each path.
+        seeds (int or list of int):
+            Seeds of the paths, or the number of paths for seeds 0, 1, ...
+        legacy (bool):
+            See generate_series.
+    Returns:
+        numpy.ndarray: prices of shape (len(seeds), size), starting from 1.
+    """
+    if isinstance(seeds, int):
+        seeds = range(seeds)
+    z = np.zeros((size, len(seeds)))
+    z[1:] = _stack_draws(seeds, legacy, lambda rs: rs.normal(0, 1, size - 1))
+    y = _garch(z, gamma, alpha, beta)
+    ts = np.cumprod(np.exp(y / 100), axis=0)
+    return np.ascontiguousarray(ts.T)
+
+
+def _random_state(seed, legacy):
+    if legacy:
+        np.random.seed(seed)
+        return np.random
+    return np.random.default_rng(seed)
+
+
+def _stack_draws(seeds, legacy, draw):
+    """Draws the random numbers of each seed in bulk and stacks them as columns."""
+    return np.stack([draw(_random_state(seed, legacy)) for seed in seeds], axis=1)
+
+
+def _random_walk_with_memory(size, seeds, legacy, r=0.3, tau=6):
+    n_step = max(size - tau, 0)
+    ts = np.empty((tau + n_step, len(seeds)))
+    p = np.empty((n_step, len(seeds)))
+    xi = np.empty((n_step, len(seeds)))
+    for i, seed in enumerate(seeds):
+        rs = _random_state(seed, legacy)
+        ts[:tau, i] = np.cumsum(rs.uniform(-0.5, 0.5, tau))
+        if legacy:
+            # The former loop drew xi only when p > r, so each series walks
+            # through its own buffer of uniform random numbers.
+            u = rs.uniform(0, 1, 2 * n_step)
+            ts[:, i] = _legacy_memory_walk(ts[:, i].copy(), u, tau, r)
+        else:
+            p[:, i] = rs.uniform(0, 1, n_step)
+            xi[:, i] = rs.uniform(-0.5, 0.5, n_step)
+    if not legacy:
+        ts = _memory_walk(ts, p, xi, tau, r)
+    return ts
+
+
+@_jit
+def _logistic_map(ts):
+    for t in range(1, ts.shape[0]):
+        ts[t] = 4 * ts[t - 1] * (1 - ts[t - 1])
+    return ts
+
+
+@_jit
+def _memory_walk(ts, p, xi, tau, r):
+    for t in range(tau, ts.shape[0]):
+        ts[t] = np.where(p[t - tau] > r, ts[t - 1] + xi[t - tau], ts[t - tau])
+    return ts
+
+
+@_jit
+def _legacy_memory_walk(ts, u, tau, r):
+    k = 0
+    for t in range(tau, ts.shape[0]):
+        p = u[k]
+        k += 1
+        if p > r:
+            ts[t] = ts[t - 1] + (-0.5 + u[k])
+            k += 1
+        else:
+            ts[t] = ts[t - tau]
+    return ts
+
+
+@_jit
+def _garch(z, gamma, alpha, beta):
+    y = np.zeros_like(z)
+    h = np.ones_like(z)
+    for t in range(1, z.shape[0]):
+        h[t] = gamma + beta * h[t - 1] + alpha * (y[t - 1] ** 2)
+        y[t] = np.sqrt(h[t]) * z[t]
+    return y
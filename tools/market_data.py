@@ -0,0 +1,88 @@
+import fnmatch
+import os
+
+import numpy as np
+import pandas as pd
+
+MARKET_LIST = ["N225", "BSESN", "HSI", "FCHI", "DJI", "GDAXI"]
+CSV_DIR = "../data/daily_stock_prices"
+STORE_DIR = "../data/daily_stock_prices_npy"
+
+
+def resolve_tickers(patterns=None, csv_dir=CSV_DIR):
+    """Returns the tickers whose CSV file in csv_dir matches one of the patterns.
+
+    Args:
+        patterns (list of str):
+            Tickers or glob patterns such as "N*", MARKET_LIST by default.
+        csv_dir (str):
+            Directory of the {ticker}.csv files.
+    Returns:
+        list of str: matched tickers in the order of the patterns.
+    """
+    if patterns is None:
+        patterns = MARKET_LIST
+    available = sorted(
+        os.path.splitext(file_name)[0]
+        for file_name in os.listdir(csv_dir)
+        if file_name.endswith(".csv")
+    )
+    ticker_list = []
+    for pattern in patterns:
+        matched = fnmatch.filter(available, pattern)
+        if len(matched) == 0:
+            raise ValueError(f"No market data matches '{pattern}' in {csv_dir}.")
+        ticker_list += [ticker for ticker in matched if ticker not in ticker_list]
+    return ticker_list
+
+
+def read_market_csv(ticker, csv_dir=CSV_DIR):
+    return (
+        pd.read_csv(
+            f"{csv_dir}/{ticker}.csv",
+            usecols=["Date", "Close"],
+            parse_dates=["Date"],
+        )
+        .dropna()
+        .rename(columns={"Close": "Price"})
+        .set_index("Date")
+    )
+
+
+def update_price_store(ticker_list, csv_dir=CSV_DIR, store_dir=STORE_DIR):
+    """Converts the CSV of each ticker into {ticker}.price.npy and {ticker}.date.npy.
+
+    A ticker is converted only if its CSV is newer than its arrays,
+    so the CSVs are parsed once and not on every run.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    for ticker in ticker_list:
+        csv_path = f"{csv_dir}/{ticker}.csv"
+        price_path = f"{store_dir}/{ticker}.price.npy"
+        if os.path.exists(price_path) and os.path.getmtime(price_path) >= os.path.getmtime(
+            csv_path
+        ):
+            continue
+        market_data = read_market_csv(ticker, csv_dir)
+        np.save(f"{store_dir}/{ticker}.date.npy", market_data.index.values)
+        # The price is written last, so that it marks a completed conversion.
+        np.save(price_path, np.ascontiguousarray(market_data.Price.values, dtype=np.float64))
+
+
+def load_prices(ticker, store_dir=STORE_DIR):
+    """Returns the dates and the prices of a ticker as read-only memory-mapped arrays.
+
+    The price array is contiguous float64, so RefinedVG reads it without a copy.
+
+    Returns:
+        tuple: (dates, prices) of numpy.memmap.
+    """
+    dates = np.load(f"{store_dir}/{ticker}.date.npy", mmap_mode="r")
+    prices = np.load(f"{store_dir}/{ticker}.price.npy", mmap_mode="r")
+    return dates, prices
+
+
+def load_market_data(ticker, store_dir=STORE_DIR):
+    """Returns the same DataFrame as read_market_csv from the price store."""
+    dates, prices = load_prices(ticker, store_dir)
+    return pd.DataFrame({"Price": prices}, index=pd.DatetimeIndex(dates, name="Date"))
@@ -1,5 +1,8 @@
 import numpy as np
+import pandas as pd
 
+from tools.convenient_functions import generate_ts
+from tools.parallel import parallel_map
 from vg_class import RefinedVG
 
 
@@ -8,32 +11,142 @@ def tti(ts, omega):
     return refined_vg.compute_irreversibility()
 
 
+def surrogate_tir(surrogate_func, args, n_iter, seed=0, n_workers=1, batch_size=1000):
+    """Computes the TIR of n_iter surrogates, batch_size of them per task.
+
+    Every task draws its surrogates from its own Generator spawned from seed,
+    so the null distribution does not depend on n_workers.
+
+    Args:
+        surrogate_func (callable):
+            Module-level function called as surrogate_func(*args, n_surrogate, seed_seq)
+            which returns the TIR of n_surrogate surrogates.
+        args (tuple):
+            Leading arguments of surrogate_func.
+        n_iter (int):
+            Number of surrogates.
+        seed (int):
+            Seed of the surrogates.
+        n_workers (int or None):
+            Number of worker processes, see tools.parallel.parallel_map.
+        batch_size (int):
+            Number of surrogates per task.
+    Returns:
+        numpy.ndarray: TIR of each surrogate.
+    """
+    seed_seq_list = np.random.SeedSequence(seed).spawn(-(-n_iter // batch_size))
+    task_list = [
+        (*args, min(batch_size, n_iter - i * batch_size), seed_seq)
+        for i, seed_seq in enumerate(seed_seq_list)
+    ]
+    return np.concatenate(parallel_map(surrogate_func, task_list, n_workers))
+
+
+def shuffle_tir(original, omega, n_surrogate, seed_seq):
+    rng = np.random.default_rng(seed_seq)
+    surrogates = rng.permuted(np.tile(original, (n_surrogate, 1)), axis=1)
+    return RefinedVG.batch_irreversibility(surrogates, window_width=omega)
+
+
+def sample_tir(original, window, omega, n_surrogate, seed_seq):
+    rng = np.random.default_rng(seed_seq)
+    sample_start = rng.integers(1, len(original) - window, n_surrogate)
+    surrogates = np.lib.stride_tricks.sliding_window_view(original, window)[sample_start]
+    return RefinedVG.batch_irreversibility(surrogates, window_width=omega)
+
+
 class ShuffleMC:
-    def __init__(self, original, omega, n_iter=10):
-        self.original = original
+    def __init__(self, original, omega, n_iter=10, seed=0, n_workers=1, batch_size=1000):
+        """Tests the TIR of the original series against random permutations of it.
+
+        Attributes:
+            result (numpy.ndarray): null distribution, the TIR of each permutation.
+            observed (float): TIR of the original series.
+            p_value (float): share of the permutations at least as irreversible.
+        """
+        self.original = np.asarray(original, dtype=np.float64)
         self.omega = omega
         self.n_iter = n_iter
-        np.random.seed(0)
-        self.result = [
-            tti(np.random.permutation(self.original), omega=self.omega)
-            for _ in range(self.n_iter)
-        ]
+        self.result = surrogate_tir(
+            shuffle_tir, (self.original, omega), n_iter, seed, n_workers, batch_size
+        )
         self.mean = np.mean(self.result)
         self.std = np.std(self.result)
+        self.observed = tti(self.original, omega=self.omega)
+        self.p_value = (1 + np.sum(self.result >= self.observed)) / (self.n_iter + 1)
 
 
 class SampleMC:
-    def __init__(self, original, window, omega, n_iter=10):
-        self.original = original
+    def __init__(
+        self,
+        original,
+        window,
+        omega,
+        n_iter=10,
+        seed=0,
+        n_workers=1,
+        batch_size=1000,
+        tested=None,
+    ):
+        """Tests the TIR of a series of length window against randomly sampled windows.
+
+        The bias of the TIR depends on the length of the series, so only a series
+        as long as the sampled windows is tested against them, not the original one.
+
+        Args:
+            tested (array-like object or None):
+                Series of length window to be tested, e.g. the latest window.
+                Without it, only the null distribution is computed.
+
+        Attributes:
+            result (numpy.ndarray): null distribution, the TIR of each sampled window.
+            observed (float or None): TIR of the tested series.
+            p_value (float or None): share of the windows at least as irreversible.
+        """
+        self.original = np.asarray(original, dtype=np.float64)
         self.window = window
         self.omega = omega
         self.n_iter = n_iter
-        np.random.seed(0)
-        self.result = [self.ret_irr() for _ in range(self.n_iter)]
+        self.result = surrogate_tir(
+            sample_tir, (self.original, window, omega), n_iter, seed, n_workers, batch_size
+        )
         self.mean = np.mean(self.result)
         self.std = np.std(self.result)
+        self.observed = None
+        self.p_value = None
+        if tested is not None:
+            if len(tested) != window:
+                raise ValueError("tested should be as long as window")
+            self.observed = tti(np.asarray(tested, dtype=np.float64), omega=self.omega)
+            self.p_value = (1 + np.sum(self.result >= self.observed)) / (self.n_iter + 1)
+
+
+def prefix_tir(graph_class, ts_kind, seed, omega, max_power_idx, min_power_idx=5):
+    """TIR of the prefixes of length 2**min_power_idx..2**max_power_idx of one series.
+
+    The series is regenerated from its seed, so that only the kind and the seed
+    are sent to a worker process and only the TIR of each length comes back.
+    """
+    vg = graph_class(generate_ts(kind=ts_kind, size=2 ** max_power_idx, seed=seed), "", omega)
+    return vg.irreversibility_by_prefix(
+        [2 ** j for j in range(min_power_idx, max_power_idx + 1)]
+    )
+
+
+def run_prefix_tir_mc(graph_class, ts_kind_list, omega, n_iter, max_power_idx, n_workers=None):
+    """Runs prefix_tir for every (series kind, seed) on a process pool.
 
-    def ret_irr(self):
-        sample_start = np.random.randint(1, len(self.original) - self.window)
-        ts = self.original[sample_start : sample_start + self.window]
-        return tti(ts, self.omega)
+    Returns:
+        dict: DataFrame for each series kind, with one row per seed
+        and one column per time series length.
+    """
+    task_list = [
+        (graph_class, ts_kind, seed, omega, max_power_idx)
+        for ts_kind in ts_kind_list
+        for seed in range(n_iter)
+    ]
+    result_list = parallel_map(prefix_tir, task_list, n_workers)
+    return {
+        ts_kind: pd.DataFrame(result_list[i * n_iter : (i + 1) * n_iter])
+        for i, ts_kind in enumerate(ts_kind_list)
+    }
@@ -0,0 +1,43 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from tools.profiling import active_profiler, profiled_call
+
+
+def parallel_map(func, task_list, n_workers=None, use_threads=False):
+    """Calls func on every task with a process pool and returns the results in order.
+
+    While a Profiler of tools.profiling is active, the records of the worker processes
+    are merged into it.
+
+    Args:
+        func (callable):
+            Module-level function, so that the workers can import it.
+        task_list (list of tuple):
+            Arguments of each call. Keep them small, e.g. a seed instead of a series.
+        n_workers (int or None):
+            Number of worker processes. None uses every core and 1 runs serially.
+        use_threads (bool):
+            If True, a thread pool is used instead, which shares the arguments without
+            copying them. Only worth it if func mostly runs NumPy code that releases the GIL.
+    Returns:
+        list: func(*task) for each task.
+    """
+    if n_workers == 1:
+        return [func(*task) for task in task_list]
+    if use_threads:
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            futures = [executor.submit(func, *task) for task in task_list]
+            return [future.result() for future in futures]
+    profiler = active_profiler()
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        if profiler is None:
+            futures = [executor.submit(func, *task) for task in task_list]
+            return [future.result() for future in futures]
+        # The records of each task come back with its result, see profiled_call.
+        futures = [executor.submit(profiled_call, func, *task) for task in task_list]
+        result_list = []
+        for future in futures:
+            result, records = future.result()
+            profiler.merge(records)
+            result_list.append(result)
+        return result_list
@@ -0,0 +1,175 @@
+import atexit
+import functools
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import pandas as pd
+
+PROFILE_ENV = "VG_PROFILE"
+
+_profiler = None
+
+
+class Profiler:
+    """Wall time, call counts and peak memory of the profiled stages of each graph.
+
+    The wall time and the peak memory of a call include the stages nested in it, e.g.
+    get_degree_sequence includes make_graph on the first access. The peak memory is
+    the peak of the traced memory during the call minus the traced memory at its start.
+    The stages run by tools.parallel.parallel_map in worker processes are merged into
+    the Profiler of the calling process, with the pid of the worker.
+    """
+
+    def __init__(self):
+        self.records = {}
+        self.stack = []
+
+    def enter(self):
+        if self.stack:
+            # The peak is reset below, so the caller keeps the peak reached so far.
+            parent = self.stack[-1]
+            parent["peak"] = max(parent["peak"], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        current = tracemalloc.get_traced_memory()[0]
+        self.stack.append({"start": current, "peak": current, "time": time.perf_counter()})
+
+    def exit(self, instance, stage):
+        elapsed_time = time.perf_counter() - self.stack[-1]["time"]
+        frame = self.stack.pop()
+        peak = max(frame["peak"], tracemalloc.get_traced_memory()[1])
+        if self.stack:
+            self.stack[-1]["peak"] = max(self.stack[-1]["peak"], peak)
+        labels = {
+            "pid": os.getpid(),
+            "class": "" if instance is None else type(instance).__name__,
+            "name": getattr(instance, "name", ""),
+            "N": getattr(instance, "N", None),
+            "window_width": getattr(instance, "window_width", None),
+            "instance": "" if instance is None else hex(id(instance)),
+            "stage": stage,
+        }
+        key = tuple(labels.values())
+        if key not in self.records:
+            self.records[key] = {**labels, "calls": 0, "wall_time": 0.0, "peak_memory": 0}
+        record = self.records[key]
+        record["calls"] += 1
+        record["wall_time"] += elapsed_time
+        record["peak_memory"] = max(record["peak_memory"], peak - frame["start"])
+
+    def merge(self, records):
+        """Adds the records of another Profiler, e.g. of a worker process."""
+        for key, other in records.items():
+            if key not in self.records:
+                self.records[key] = dict(other)
+                continue
+            record = self.records[key]
+            record["calls"] += other["calls"]
+            record["wall_time"] += other["wall_time"]
+            record["peak_memory"] = max(record["peak_memory"], other["peak_memory"])
+
+    def to_frame(self):
+        return pd.DataFrame(
+            list(self.records.values()),
+            columns=[
+                "pid",
+                "class",
+                "name",
+                "N",
+                "window_width",
+                "instance",
+                "stage",
+                "calls",
+                "wall_time",
+                "peak_memory",
+            ],
+        )
+
+    def dump(self, path):
+        """Writes the records to a .json or .csv file.
+
+        "{pid}" in path is replaced with the process id, e.g. to keep concurrent runs apart.
+        """
+        path = path.format(pid=os.getpid())
+        if path.endswith(".json"):
+            with open(path, "w") as f:
+                json.dump(list(self.records.values()), f, indent=2)
+        else:
+            self.to_frame().to_csv(path, index=False)
+
+
+def profiled(stage):
+    """Records the calls of a function or a method while a Profiler is active.
+
+    Without an active Profiler the function is called as it is.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _profiler is None:
+                return func(*args, **kwargs)
+            instance = args[0] if args and hasattr(args[0], "N") else None
+            _profiler.enter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _profiler.exit(instance, stage)
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def profile(path=None):
+    """Profiles the stages called in the block and dumps them to path if given.
+
+    Examples:
+        >>> with profile("output/profile.csv") as profiler:
+        ...     RefinedVG(ts, window_width=2).compute_irreversibility()
+        >>> profiler.to_frame()
+    """
+    global _profiler
+    previous = _profiler
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    _profiler = Profiler()
+    try:
+        yield _profiler
+    finally:
+        profiler, _profiler = _profiler, previous
+        if not was_tracing:
+            tracemalloc.stop()
+        if path is not None:
+            profiler.dump(path)
+
+
+def active_profiler():
+    """Returns the active Profiler, or None."""
+    return _profiler
+
+
+def profiled_call(func, *args):
+    """Calls func with a Profiler of its own and returns its records along with the result.
+
+    tools.parallel.parallel_map runs the tasks of a worker process through it, since
+    the workers exit without running the atexit hook of VG_PROFILE.
+    """
+    with profile() as profiler:
+        result = func(*args)
+    return result, profiler.records
+
+
+def _profile_whole_run(path):
+    context = profile(path)
+    context.__enter__()
+    atexit.register(context.__exit__, None, None, None)
+
+
+if os.environ.get(PROFILE_ENV):
+    # e.g. VG_PROFILE=profile.csv python monte_carlo_dv-vg.py --omega 2
+    _profile_whole_run(os.environ[PROFILE_ENV])
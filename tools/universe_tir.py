@@ -0,0 +1,79 @@
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from tools.market_data import STORE_DIR, load_prices
+from tools.parallel import parallel_map
+from vg_class import RefinedVG
+
+
+def ticker_rolling_tir(ticker, omega, period_length_list, store_dir=STORE_DIR):
+    """Rolling TIR of one ticker for every period length, sharing one RefinedVG.
+
+    Returns:
+        pandas.DataFrame:
+            Long format with columns ticker, omega, period_length, Date and TIR.
+            The periods shorter than period_length are dropped.
+    """
+    dates, prices = load_prices(ticker, store_dir)
+    rvg = RefinedVG(time_series=prices, name=f"{ticker}-Refined-VG", window_width=omega)
+    result_list = []
+    for period_length in period_length_list:
+        tir_seq = rvg.rolling_irreversibility(period_length).values
+        is_valid = ~np.isnan(tir_seq)
+        result_list.append(
+            pd.DataFrame(
+                {
+                    "ticker": ticker,
+                    "omega": omega,
+                    "period_length": period_length,
+                    "Date": dates[is_valid],
+                    "TIR": tir_seq[is_valid],
+                }
+            )
+        )
+    return pd.concat(result_list, ignore_index=True)
+
+
+def run_universe_tir(ticker_list, config_list, n_workers=None, store_dir=STORE_DIR):
+    """Computes the rolling TIR of every ticker for every (omega, period_length).
+
+    Each task is one (ticker, omega) with all its period lengths, so that the graph
+    is built once per task. The tasks are submitted from the longest series to the
+    shortest, so that a long series does not start last and keep the pool waiting.
+
+    Args:
+        ticker_list (list of str):
+            Tickers in the price store, see tools.market_data.update_price_store.
+        config_list (list of tuple):
+            (omega, period_length) configurations.
+        n_workers (int or None):
+            Number of worker processes, see tools.parallel.parallel_map.
+        store_dir (str):
+            Directory of the price store.
+    Returns:
+        pandas.DataFrame:
+            Long format with columns ticker, omega, period_length, Date and TIR,
+            ordered by ticker, omega and period_length as they first appear.
+    """
+    period_length_dict = defaultdict(list)
+    for omega, period_length in config_list:
+        if period_length not in period_length_dict[omega]:
+            period_length_dict[omega].append(period_length)
+    length_dict = {ticker: len(load_prices(ticker, store_dir)[1]) for ticker in ticker_list}
+    task_list = sorted(
+        (
+            (ticker, omega, period_length_list, store_dir)
+            for ticker in ticker_list
+            for omega, period_length_list in period_length_dict.items()
+        ),
+        key=lambda task: length_dict[task[0]],
+        reverse=True,
+    )
+    result_list = parallel_map(ticker_rolling_tir, task_list, n_workers)
+    result_dict = {task[:2]: result for task, result in zip(task_list, result_list)}
+    return pd.concat(
+        [result_dict[(ticker, omega)] for ticker in ticker_list for omega in period_length_dict],
+        ignore_index=True,
+    )
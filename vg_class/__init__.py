@@ -1,14 +1,13 @@
 from ._base_graphs import BaseGraph
 from ._efficient_original_vg import EfficientVisibilityGraph
-from ._original_graphs import (
-    HorizontalVisibilityGraph,
-    InvisibilityGraph,
-    VisibilityGraph,
-)
+from ._online_refined_vg import OnlineRefinedVG
+from ._original_graphs import HorizontalVisibilityGraph, InvisibilityGraph, VisibilityGraph
+from ._out_of_core import OutOfCoreRefinedVG
 from ._refined_vg import RefinedVG
 from ._rise_vs_fall_graphs import (
     FallInvisibilityGraph,
     FallVisibilityGraph,
+    FusedRiseFallGraphs,
     RiseInvisibilityGraph,
     RiseVisibilityGraph,
 )
@@ -20,10 +19,13 @@ __all__ = [
     "FallVisibilityGraph",
     "RiseInvisibilityGraph",
     "FallInvisibilityGraph",
+    "FusedRiseFallGraphs",
     "VisibilityGraph",
     "InvisibilityGraph",
     "HorizontalVisibilityGraph",
     "RefinedVG",
+    "OnlineRefinedVG",
+    "OutOfCoreRefinedVG",
     "BasicSubGraph",
     "RefinedSubGraph",
     "EfficientVisibilityGraph",
@@ -6,7 +6,10 @@ import networkx as nx
 import numpy as np
 import pandas as pd
 
-from tools.convenient_functions import KLD
+from tools.convenient_functions import KLD, array_KLD
+from tools.profiling import profiled
+
+from ._edges import EDGE_KINDS
 
 plt.rcParams["font.size"] = 15
 
@@ -22,24 +25,114 @@ class BaseGraph(metaclass=ABCMeta):
         """
         self.name = name
         self.N = len(time_series)
-        self.ts = [(t, x) for t, x in enumerate(time_series, 1)]
-        self.graph = self.make_graph()
+        self.values = np.asarray(time_series, dtype=np.float64)
+        # The edges are made on the first access, see build.
+        self._csr = None
+        self._graph = None
+        self._ts = None
 
-    @abstractmethod
+    @property
+    def ts(self):
+        # Built once on the first access; the graphs themselves only use the values array.
+        if self._ts is None:
+            self._ts = [(t, x) for t, x in enumerate(self.values.tolist(), 1)]
+        return self._ts
+
+    @property
+    def graph(self):
+        # The networkx graph is only built for plotting or analysis with networkx.
+        if self._graph is None:
+            self._graph = self.to_networkx()
+        return self._graph
+
+    def build(self):
+        """Makes the edges unless they are already made, and returns the graph itself."""
+        if self._csr is None:
+            self.make_graph()
+        return self
+
+    @profiled("make_graph")
     def make_graph(self):
+        self.set_edges(*self.make_edges())
+
+    def release(self):
+        """Frees the edges and the networkx graph. They are made again on the next access."""
+        self._csr = None
+        self._graph = None
+
+    @abstractmethod
+    def make_edges(self):
+        """Returns (source, target) or (source, target, kind) arrays of node labels."""
         pass
 
-    def get_degree_sequence(self, deg_kind):
+    def set_edges(self, source, target, kind=None):
+        """Stores the edges in CSR format.
+
+        The targets of node i + 1 are indices[indptr[i] : indptr[i + 1]] + 1 in ascending
+        order, and kinds holds the index in EDGE_KINDS of each edge if kind is given.
+        """
+        source = np.asarray(source, dtype=np.int64)
+        target = np.asarray(target, dtype=np.int64)
+        order = np.lexsort((target, source))
+        indptr = np.zeros(self.N + 1, dtype=np.int64)
+        np.cumsum(np.bincount(source - 1, minlength=self.N), out=indptr[1:])
+        indices = (target[order] - 1).astype(np.int32)
+        kinds = None if kind is None else np.asarray(kind, dtype=np.int8)[order]
+        self._csr = (indptr, indices, kinds)
+        self._graph = None
+
+    @property
+    def indptr(self):
+        return self._csr[0] if self._csr is not None else self.build()._csr[0]
+
+    @property
+    def indices(self):
+        return self._csr[1] if self._csr is not None else self.build()._csr[1]
+
+    @property
+    def kinds(self):
+        return self._csr[2] if self._csr is not None else self.build()._csr[2]
+
+    @property
+    def edges(self):
+        indptr, indices, kinds = self.build()._csr
+        source = np.repeat(np.arange(1, self.N + 1), np.diff(indptr))
+        target = indices.astype(np.int64) + 1
+        if kinds is None:
+            return source, target
+        return source, target, kinds
+
+    @profiled("to_networkx")
+    def to_networkx(self):
+        G = nx.DiGraph()
+        G.add_nodes_from((t, {"value": x}) for t, x in enumerate(self.values.tolist(), 1))
+        source, target = self.edges[:2]
+        if self.kinds is None:
+            G.add_edges_from(zip(source.tolist(), target.tolist()))
+        else:
+            G.add_edges_from(
+                (ta, tb, {"edge_kind": EDGE_KINDS[k]})
+                for ta, tb, k in zip(source.tolist(), target.tolist(), self.kinds.tolist())
+            )
+        return G
+
+    def get_degree_array(self, deg_kind):
         if deg_kind == "degree":
-            degree_sequence = {n: d for n, d in self.graph.degree()}
+            degrees = self.get_degree_array("indegree") + self.get_degree_array("outdegree")
         elif deg_kind == "indegree":
-            degree_sequence = {n: d for n, d in self.graph.in_degree()}
+            degrees = np.bincount(self.indices, minlength=self.N)
         elif deg_kind == "outdegree":
-            degree_sequence = {n: d for n, d in self.graph.out_degree()}
+            degrees = np.diff(self.indptr)
         else:
             raise ValueError(
                 "deg_kind should either be degree, indegree or outdegree"
             )
+        return degrees
+
+    @profiled("get_degree_sequence")
+    def get_degree_sequence(self, deg_kind):
+        degrees = self.get_degree_array(deg_kind)
+        degree_sequence = dict(zip(range(1, self.N + 1), degrees.tolist()))
         return degree_sequence
 
     def get_degree_cnt_dict(self, **kargs):
@@ -51,12 +144,55 @@ class BaseGraph(metaclass=ABCMeta):
         kld = KLD(indegree_dict, outdegree_dict)
         return kld
 
+    def get_edge_arrays(self):
+        return self.edges[:2]
+
+    def irreversibility_by_prefix(self, N_list):
+        """Computes the irreversibility of subgraph(range(1, N + 1)) for every N in N_list.
+
+        The nodes are added in time order. A new node comes with its final
+        indegree, and the outdegrees of the sources of its in-edges are updated
+        in the running histograms, so that the whole sweep costs O(N + E)
+        instead of building and counting every subgraph.
+
+        Args:
+            N_list (list of int):
+                Lengths of the prefixes.
+        Returns:
+            dict: irreversibility of each length.
+        """
+        if min(N_list) < 1 or max(N_list) > self.N:
+            raise ValueError(f"N should be between 1 and {self.N}")
+        source, target = self.get_edge_arrays()
+        order = np.argsort(target, kind="stable")
+        source, target = source[order] - 1, target[order]
+        indegrees = np.bincount(target - 1, minlength=self.N)
+        outdegrees = np.zeros(self.N, dtype=np.int64)
+        max_degree = max(indegrees.max(), np.bincount(source, minlength=1).max())
+        in_hist = np.zeros(max_degree + 1, dtype=np.int64)
+        out_hist = np.zeros(max_degree + 1, dtype=np.int64)
+        kld_dict = {}
+        N_prev, edge_end = 0, 0
+        for N in sorted(set(N_list)):
+            # New nodes have their final indegrees and no out-edge yet.
+            np.add.at(in_hist, indegrees[N_prev:N], 1)
+            out_hist[0] += N - N_prev
+            # Out-edges reaching the new nodes.
+            edge_start, edge_end = edge_end, np.searchsorted(target, N, side="right")
+            nodes, cnt = np.unique(source[edge_start:edge_end], return_counts=True)
+            np.add.at(out_hist, outdegrees[nodes], -1)
+            outdegrees[nodes] += cnt
+            np.add.at(out_hist, outdegrees[nodes], 1)
+            appears = (in_hist > 0) | (out_hist > 0)
+            kld_dict[N] = array_KLD(in_hist[appears], out_hist[appears])
+            N_prev = N
+        return {N: kld_dict[N] for N in N_list}
+
     def plot_original_time_series(self, tstart=1, tend=None, save_path=None):
         if tend is None:
             tend = self.N
         plt.figure(figsize=(12, 6))
-        ts_dic = {data[0]: data[1] for data in self.ts}
-        pd.Series(ts_dic).loc[tstart:tend].plot()
+        pd.Series(self.values, index=range(1, self.N + 1)).loc[tstart:tend].plot()
         plt.suptitle(f"{self.name}", fontsize=20)
         plt.title(f"Original Time Series(trange: {tstart}~{tend})", fontsize=15)
         plt.xlabel("Timestep")
@@ -83,8 +219,8 @@ class BaseGraph(metaclass=ABCMeta):
             width=0.7,
         )
         plt.plot(
-            [n[0] for n in self.ts[tstart - 1 : tend]],
-            [n[1] for n in self.ts[tstart - 1 : tend]],
+            range(tstart, tend + 1),
+            self.values[tstart - 1 : tend],
             c="k",
             mfc="lightgreen",
             ms=20,
@@ -122,7 +258,7 @@ class BaseGraph(metaclass=ABCMeta):
 
     def log_log_index_plot(self, save=False, save_path=None):
         indegree_sequence = sorted(
-            [d for n, d in self.graph.in_degree()], reverse=True
+            self.get_degree_array("indegree").tolist(), reverse=True
         )
         d_list = np.unique(indegree_sequence)
         p_list = [
@@ -0,0 +1,582 @@
+import numpy as np
+
+EDGE_KINDS = ("RV", "RIV", "FV", "FIV")
+# Comparing the slopes and checking the nodes against the line only disagree when the two
+# slopes are within a few roundings of the largest magnitude of the pair and the nodes between,
+# abs_max. Pairs within TIE_RTOL * abs_max of the running extremum are rechecked against the
+# line, with a wide margin over that bound.
+TIE_RTOL = 64 * np.finfo(np.float64).eps
+# Pairs up to this lag apart are found lag by lag by natural_vg_edges even without window_width.
+SHORT_LAG = 32
+
+
+def refined_vg_edges(values, window_width, method="direct"):
+    """Computes the edges of the refined visibility graph with array operations.
+
+    For every lag 1..window_width, the visible/invisible and rise/fall masks of all
+    the nodes are evaluated at once, which gives exactly the edges of the node-wise
+    loop (`real < line` for visibility and `real >= line` for invisibility).
+
+    Args:
+        values (array-like object):
+            The original time series.
+        window_width (int):
+            Maximum time lag between two connected nodes.
+        method (str):
+            'direct' checks every node between a and b against the line, which
+            costs O(N * window_width ** 2). 'slope' tracks the running extrema
+            of the slopes from each a instead, see refined_slope_kinds.
+    Returns:
+        tuple of numpy.ndarray:
+            (source, target, kind), sorted by source and then by time lag.
+            source and target are the node labels (starting from 1) and kind is
+            the index of the edge kind in EDGE_KINDS.
+    """
+    y = np.asarray(values, dtype=np.float64)
+    n = len(y)
+    if method == "direct":
+        kind_list_by_lag = (
+            refined_lag_kinds(y, lag) for lag in range(1, min(window_width, n - 1) + 1)
+        )
+    elif method == "slope":
+        kind_list_by_lag = refined_slope_kinds(y, window_width)
+    else:
+        raise ValueError("method should either be 'direct' or 'slope'")
+    source_list, target_list, kind_list = [], [], []
+    for lag, kind in enumerate(kind_list_by_lag, 1):
+        connect = kind >= 0
+        ta = np.flatnonzero(connect) + 1
+        source_list.append(ta)
+        target_list.append(ta + lag)
+        kind_list.append(kind[connect])
+    if len(source_list) == 0:
+        return (
+            np.empty(0, dtype=np.int64),
+            np.empty(0, dtype=np.int64),
+            np.empty(0, dtype=np.int8),
+        )
+    source = np.concatenate(source_list)
+    order = np.argsort(source, kind="stable")
+    return (
+        source[order],
+        np.concatenate(target_list)[order],
+        np.concatenate(kind_list)[order],
+    )
+
+
+def refined_lag_kinds(y, lag):
+    """Classifies the pairs (a, a + lag) of the refined visibility graph.
+
+    Args:
+        y (numpy.ndarray):
+            The original time series along the last axis, e.g. a batch of shape
+            (n_series, N).
+        lag (int):
+            Time lag of the pairs.
+    Returns:
+        numpy.ndarray:
+            Index of the edge kind in EDGE_KINDS for every source a, or -1 if
+            a and a + lag are not connected. The shape is y.shape[:-1] + (N - lag,).
+    """
+    n = y.shape[-1]
+    ya = y[..., : n - lag]
+    slope = (y[..., lag:] - ya) / lag
+    isVisible = np.ones(slope.shape, dtype=bool)
+    isInvisible = np.ones(slope.shape, dtype=bool)
+    # Check every node c which is located between a and b.
+    for j in range(1, lag):
+        line = ya + (slope * j)
+        real = y[..., j : n - lag + j]
+        isVisible &= real < line
+        isInvisible &= real >= line
+    isRise = slope > 0
+    isFall = slope <= 0
+    connect = isVisible | isInvisible
+    if np.any(connect & ~(isRise | isFall)):
+        raise ValueError("time series should not contain NaN")
+    kind = np.where(isRise, np.where(isVisible, 0, 1), np.where(isVisible, 2, 3))
+    return np.where(connect, kind, -1).astype(np.int8)
+
+
+def refined_slope_kinds(y, window_width):
+    """Classifies the pairs of the refined visibility graph lag by lag in O(N * window_width).
+
+    A node c between a and b is below the line from a to b iff the slope from a to c
+    is smaller than the slope from a to b. Keeping the maximum and the minimum slope
+    from each a over the shorter lags, (a, a + lag) is visible iff its slope exceeds
+    the maximum and invisible iff it does not exceed the minimum, which keeps the
+    `<` / `>=` rule. A pair whose slope is within rounding of either extremum, e.g.
+    a node collinear with a and b, is rechecked against the line as in
+    refined_lag_kinds, so that the kinds are exactly the same.
+
+    Args:
+        y (numpy.ndarray):
+            The original time series.
+        window_width (int):
+            Maximum time lag between two connected nodes.
+    Yields:
+        numpy.ndarray: refined_lag_kinds(y, lag) for every lag 1..window_width.
+    """
+    n = len(y)
+    if n > 1 and np.isnan(y).any():
+        raise ValueError("time series should not contain NaN")
+    max_slope = np.full(n, -np.inf)
+    min_slope = np.full(n, np.inf)
+    abs_max = np.abs(y)
+    for lag in range(1, min(window_width, n - 1) + 1):
+        slope = (y[lag:] - y[: n - lag]) / lag
+        max_prev = max_slope[: n - lag]
+        min_prev = min_slope[: n - lag]
+        # The largest magnitude from a to a + lag bounds the rounding errors, see TIE_RTOL.
+        abs_max = np.maximum(abs_max[: n - lag], np.abs(y[lag:]))
+        tol = TIE_RTOL * abs_max
+        isVisible = slope > max_prev
+        isInvisible = slope <= min_prev
+        near_tie = np.flatnonzero(
+            (np.abs(slope - max_prev) <= tol) | (np.abs(slope - min_prev) <= tol)
+        )
+        if len(near_tie) > 0:
+            isVisible[near_tie], isInvisible[near_tie] = _line_visibility(y, near_tie, lag)
+        np.maximum(max_prev, slope, out=max_prev)
+        np.minimum(min_prev, slope, out=min_prev)
+        isRise = slope > 0
+        connect = isVisible | isInvisible
+        kind = np.where(isRise, np.where(isVisible, 0, 1), np.where(isVisible, 2, 3))
+        yield np.where(connect, kind, -1).astype(np.int8)
+
+
+def _line_visibility(y, source, lag):
+    """Evaluates the pairs (a, a + lag) for the given sources a exactly as refined_lag_kinds."""
+    ya = y[source]
+    slope = (y[source + lag] - ya) / lag
+    isVisible = np.ones(len(source), dtype=bool)
+    isInvisible = np.ones(len(source), dtype=bool)
+    for j in range(1, lag):
+        line = ya + (slope * j)
+        real = y[source + j]
+        isVisible &= real < line
+        isInvisible &= real >= line
+    return isVisible, isInvisible
+
+
+def refined_last_node_kinds(y):
+    """Classifies the pairs (a, b) of the refined visibility graph ending at the last node b.
+
+    The lines are evaluated as in refined_lag_kinds, so that the kinds are the same.
+
+    Args:
+        y (numpy.ndarray):
+            The last lag_max + 1 values of the time series.
+    Returns:
+        numpy.ndarray:
+            Index of the edge kind in EDGE_KINDS for every lag 1..lag_max,
+            or -1 if the pair is not connected.
+    """
+    lag_max = len(y) - 1
+    lag = np.arange(1, lag_max + 1)
+    ya = y[lag_max - lag]
+    slope = (y[-1] - ya) / lag
+    j = np.arange(1, lag_max)
+    # Only the nodes c with j < lag are located between a and b.
+    between = j < lag[:, None]
+    line = ya[:, None] + (slope[:, None] * j)
+    real = y[np.minimum(lag_max - lag[:, None] + j, lag_max)]
+    isVisible = np.all((real < line) | ~between, axis=1)
+    isInvisible = np.all((real >= line) | ~between, axis=1)
+    isRise = slope > 0
+    isFall = slope <= 0
+    connect = isVisible | isInvisible
+    if np.any(connect & ~(isRise | isFall)):
+        raise ValueError("time series should not contain NaN")
+    kind = np.where(isRise, np.where(isVisible, 0, 1), np.where(isVisible, 2, 3))
+    return np.where(connect, kind, -1).astype(np.int8)
+
+
+def refined_block_degrees(segment, n_source, window_width, method="direct"):
+    """Counts the degrees of the edges from the first n_source nodes of a segment.
+
+    A pair depends only on the values from its source to its target, so the segment
+    only has to extend window_width nodes past the block of sources (the halo),
+    or up to the end of the series.
+
+    Args:
+        segment (numpy.ndarray):
+            The values of the block of sources followed by the halo.
+        n_source (int):
+            Number of the source nodes of the block.
+        window_width (int):
+            Maximum time lag between two connected nodes.
+        method (str):
+            See refined_vg_edges.
+    Returns:
+        tuple of numpy.ndarray:
+            (indegree_matrix, outdegree_matrix) of shape (len(segment), 4) and
+            (n_source, 4). The indegrees of the halo are partial.
+    """
+    source, target, kind = refined_vg_edges(segment, window_width, method)
+    from_block = source <= n_source
+    indegree_matrix, outdegree_matrix = refined_degree_matrices(
+        len(segment), source[from_block], target[from_block], kind[from_block]
+    )
+    return indegree_matrix.astype(np.int32), outdegree_matrix[:n_source].astype(np.int32)
+
+
+def refined_degree_batch(values, window_width):
+    """Counts the degree matrices of the refined visibility graph of many series at once.
+
+    No edge is materialised: the kinds of each lag are added to the degrees directly.
+
+    Args:
+        values (array-like object):
+            Time series of shape (n_series, N).
+        window_width (int):
+            Maximum time lag between two connected nodes.
+    Returns:
+        tuple of numpy.ndarray:
+            (indegree_matrix, outdegree_matrix) of shape (n_series, N, 4),
+            whose last axis follows EDGE_KINDS.
+    """
+    y = np.asarray(values, dtype=np.float64)
+    n = y.shape[-1]
+    indegree_matrix = np.zeros(y.shape + (len(EDGE_KINDS),), dtype=np.int32)
+    outdegree_matrix = np.zeros(y.shape + (len(EDGE_KINDS),), dtype=np.int32)
+    for lag in range(1, min(window_width, n - 1) + 1):
+        kind = refined_lag_kinds(y, lag)
+        for k in range(len(EDGE_KINDS)):
+            is_kind = kind == k
+            indegree_matrix[..., lag:, k] += is_kind
+            outdegree_matrix[..., : n - lag, k] += is_kind
+    return indegree_matrix, outdegree_matrix
+
+
+def natural_vg_edges(values, window_width=None, invisible=False):
+    """Computes the edges of the (in)visibility graph.
+
+    A node c between a and b hides b from a iff the slope from a to c is not
+    smaller than the slope from a to b (yc >= line). Hence each lag only needs
+    the running maximum slope of the shorter lags, and the windowed graph is
+    computed for all the nodes at once with O(N * window_width) array operations.
+    Without window_width, the pairs up to SHORT_LAG apart are found in the same
+    way. A node above the line between every pair across it hides all those pairs,
+    so the longer pairs with such a pivot are found by a prefix maximum of the
+    slopes and both sides are processed recursively. The pivot is the highest node
+    once the trend between both ends of the segment is removed, which keeps trending
+    series balanced, i.e. O(N log N) for typical series. If that node is not higher
+    than the others beyond rounding, the highest node is used, so a series with long
+    runs of collinear points, e.g. a linear ramp, costs O(N ** 2). The invisibility
+    graph (hidden iff yc <= line) is the visibility graph of the negated series.
+
+    A pair whose slope is within rounding of the running maximum, e.g. with a node
+    collinear with a and b, is rechecked against the line as in VisibilityGraph,
+    so that the ties are resolved exactly as there.
+
+    Args:
+        values (array-like object):
+            The original time series.
+        window_width (int or None):
+            Maximum time lag between two connected nodes.
+        invisible (bool):
+            Whether to compute the invisibility graph.
+    Returns:
+        tuple of numpy.ndarray:
+            (source, target) node labels (starting from 1) sorted by source and target.
+    """
+    y = np.asarray(values, dtype=np.float64)
+    if invisible:
+        y = -y
+    n = len(y)
+    source_list, target_list = _windowed_visible_pairs(
+        y, SHORT_LAG if window_width is None else window_width
+    )
+    if window_width is None:
+        # The segments of up to SHORT_LAG + 1 nodes have no longer pairs.
+        segments = [(0, n)]
+        while segments:
+            lo, hi = segments.pop()
+            if hi - lo <= SHORT_LAG + 1:
+                continue
+            # The largest magnitude of the segment bounds the rounding errors.
+            tol = TIE_RTOL * np.max(np.abs(y[lo:hi]))
+            top = _pivot(y[lo:hi], tol) + lo
+            tb = _visible_from_pivot(y, top, hi, tol)
+            ta = _visible_from_pivot(y, top, lo - 1, tol)
+            source_list.extend([np.full(len(tb), top), ta])
+            target_list.extend([tb, np.full(len(ta), top)])
+            segments.extend([(lo, top), (top + 1, hi)])
+    if len(source_list) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    source = np.concatenate(source_list).astype(np.int64) + 1
+    target = np.concatenate(target_list).astype(np.int64) + 1
+    order = np.lexsort((target, source))
+    return source[order], target[order]
+
+
+def _windowed_visible_pairs(y, window_width):
+    """Finds the visible pairs (indices of y) up to window_width apart, lag by lag."""
+    n = len(y)
+    source_list, target_list = [], []
+    max_slope = np.full(n, -np.inf)
+    abs_max = np.abs(y)
+    for lag in range(1, min(window_width, n - 1) + 1):
+        slope = (y[lag:] - y[: n - lag]) / lag
+        max_prev = max_slope[: n - lag]
+        # The largest magnitude from a to a + lag bounds the rounding errors.
+        abs_max = np.maximum(abs_max[: n - lag], np.abs(y[lag:]))
+        isVisible = slope > max_prev
+        near_tie = np.flatnonzero(np.abs(slope - max_prev) <= TIE_RTOL * abs_max)
+        if len(near_tie) > 0:
+            isVisible[near_tie] = _pair_visibility(y, near_tie, near_tie + lag)
+        np.maximum(max_prev, slope, out=max_prev)
+        ta = np.flatnonzero(isVisible)
+        source_list.append(ta)
+        target_list.append(ta + lag)
+    return source_list, target_list
+
+
+def _visible_from_pivot(y, top, stop, tol):
+    """Finds the nodes visible from the pivot top more than SHORT_LAG apart.
+
+    Args:
+        y (numpy.ndarray):
+            The time series.
+        top (int):
+            Index of the pivot.
+        stop (int):
+            Index of the node next to the segment, i.e. the nodes from top towards
+            stop (both excluded) are checked.
+        tol (float):
+            Bound of the rounding errors of the slopes.
+    Returns:
+        numpy.ndarray: indices of the visible nodes.
+    """
+    direction = 1 if stop > top else -1
+    y_other = y[top + 1 : stop] if direction == 1 else y[stop + 1 : top][::-1]
+    # The slope to the node (lag + 1) * direction from top exceeds the slopes to the
+    # nearer nodes iff the node is visible.
+    slope = (y_other - y[top]) / np.arange(1, len(y_other) + 1)
+    prev_max = np.maximum.accumulate(slope)[SHORT_LAG - 1 : -1]
+    isVisible = np.zeros(len(slope), dtype=bool)
+    isVisible[SHORT_LAG:] = slope[SHORT_LAG:] > prev_max
+    near_tie = np.flatnonzero(np.abs(slope[SHORT_LAG:] - prev_max) <= tol) + SHORT_LAG
+    if len(near_tie) > 0:
+        node = top + direction * (near_tie + 1)
+        isVisible[near_tie] = _pair_visibility(y, np.minimum(node, top), np.maximum(node, top))
+    return top + direction * (np.flatnonzero(isVisible) + 1)
+
+
+def _pivot(segment, tol):
+    """Finds a node of the segment which hides every pair across it.
+
+    The highest node of the detrended segment is above the line between any pair
+    across it by at least its margin over the other nodes, so it is used if the
+    margin exceeds the rounding errors tol. Otherwise the highest node is used.
+    """
+    trend = (segment[-1] - segment[0]) / (len(segment) - 1)
+    detrended = segment - trend * np.arange(len(segment))
+    top = int(np.argmax(detrended))
+    highest = detrended[top]
+    detrended[top] = -np.inf
+    if highest - np.max(detrended) > tol:
+        return top
+    return int(np.argmax(segment))
+
+
+def _pair_visibility(y, source, target):
+    """Evaluates the pairs (source, target) (indices of y) exactly as VisibilityGraph.
+
+    The nodes between each pair are checked in blocks of doubling width from the
+    source, and a pair stops at the block of its first hiding node.
+    """
+    ya = y[source]
+    lag = target - source
+    slope = (y[target] - ya) / lag
+    isVisible = np.ones(len(source), dtype=bool)
+    active = np.flatnonzero(lag > 1)
+    j_lo, width = 1, 1
+    while len(active) > 0:
+        j = np.arange(j_lo, j_lo + width)
+        hidden = np.zeros(len(active), dtype=bool)
+        # Bounds the size of the (pair, node) arrays.
+        step = max(2 ** 20 // width, 1)
+        for k in range(0, len(active), step):
+            pair = active[k : k + step]
+            between = j < lag[pair, None]
+            c = np.minimum(source[pair, None] + j, target[pair, None])
+            line = ya[pair, None] + (slope[pair, None] * j)
+            hidden[k : k + step] = np.any((y[c] >= line) & between, axis=1)
+        isVisible[active[hidden]] = False
+        active = active[~hidden & (lag[active] > j_lo + width)]
+        j_lo, width = j_lo + width, 2 * width
+    return isVisible
+
+
+def rise_fall_edges(values, window_width):
+    """Computes the edges of the four rise/fall (in)visibility graphs in a single pass.
+
+    Every pair within window_width is classified once: a rise (ya < yb) or a fall
+    (ya > yb), and visible (the slope exceeds the running maximum slope of the
+    shorter lags) or invisible (the slope is below the running minimum slope).
+    Adjacent nodes are both visible and invisible, hence appear in two graphs.
+    A pair whose slope is within rounding of either extremum is rechecked against
+    the line as in natural_vg_edges.
+
+    Args:
+        values (array-like object):
+            The original time series.
+        window_width (int):
+            Maximum time lag between two connected nodes.
+    Returns:
+        tuple of numpy.ndarray:
+            (source, target, kind) in the same format as refined_vg_edges,
+            sorted by source and target.
+    """
+    y = np.asarray(values, dtype=np.float64)
+    n = len(y)
+    source_list, target_list, kind_list = [], [], []
+    max_slope = np.full(n, -np.inf)
+    min_slope = np.full(n, np.inf)
+    abs_max = np.abs(y)
+    for lag in range(1, min(window_width, n - 1) + 1):
+        ya = y[: n - lag]
+        yb = y[lag:]
+        slope = (yb - ya) / lag
+        max_prev = max_slope[: n - lag]
+        min_prev = min_slope[: n - lag]
+        abs_max = np.maximum(abs_max[: n - lag], np.abs(yb))
+        isVisible = slope > max_prev
+        isInvisible = slope < min_prev
+        near_tie = np.flatnonzero(np.abs(slope - max_prev) <= TIE_RTOL * abs_max)
+        if len(near_tie) > 0:
+            isVisible[near_tie] = _pair_visibility(y, near_tie, near_tie + lag)
+        near_tie = np.flatnonzero(np.abs(slope - min_prev) <= TIE_RTOL * abs_max)
+        if len(near_tie) > 0:
+            # The line test of the invisibility (yc > line) is that of the negated series.
+            isInvisible[near_tie] = _pair_visibility(-y, near_tie, near_tie + lag)
+        isRise = ya < yb
+        isFall = ya > yb
+        for kind, connect in enumerate(
+            [isRise & isVisible, isRise & isInvisible, isFall & isVisible, isFall & isInvisible]
+        ):
+            ta = np.flatnonzero(connect) + 1
+            source_list.append(ta)
+            target_list.append(ta + lag)
+            kind_list.append(np.full(len(ta), kind, dtype=np.int8))
+        np.maximum(max_prev, slope, out=max_prev)
+        np.minimum(min_prev, slope, out=min_prev)
+    if len(source_list) == 0:
+        return (
+            np.empty(0, dtype=np.int64),
+            np.empty(0, dtype=np.int64),
+            np.empty(0, dtype=np.int8),
+        )
+    source = np.concatenate(source_list)
+    target = np.concatenate(target_list)
+    order = np.lexsort((target, source))
+    return source[order], target[order], np.concatenate(kind_list)[order]
+
+
+def horizontal_vg_edges(values, window_width=None):
+    """Computes the edges of the horizontal visibility graph with a monotone stack.
+
+    The stack keeps the nodes which can still see a later node, i.e. the nodes
+    not lower than any node after them. A new node b sees the nodes lower than b
+    on the stack (which are then hidden by b for good), the nodes as high as b,
+    and the first node higher than b. The cost is O(N + E).
+
+    Args:
+        values (array-like object):
+            The original time series.
+        window_width (int or None):
+            Maximum time lag between two connected nodes.
+    Returns:
+        tuple of numpy.ndarray:
+            (source, target) node labels (starting from 1) sorted by source and target.
+    """
+    y = np.asarray(values, dtype=np.float64).tolist()
+    source_list, target_list = [], []
+    stack = []
+    for tb, yb in enumerate(y, 1):
+        while stack and y[stack[-1] - 1] < yb:
+            ta = stack.pop()
+            if window_width is None or tb - ta <= window_width:
+                source_list.append(ta)
+                target_list.append(tb)
+        for ta in reversed(stack):
+            if window_width is not None and tb - ta > window_width:
+                break
+            source_list.append(ta)
+            target_list.append(tb)
+            if y[ta - 1] > yb:
+                break
+        stack.append(tb)
+    source = np.array(source_list, dtype=np.int64)
+    target = np.array(target_list, dtype=np.int64)
+    order = np.lexsort((target, source))
+    return source[order], target[order]
+
+
+def refined_degree_matrices(n, source, target, kind):
+    """Counts the in- and out-degrees of every node for each edge kind.
+
+    Args:
+        n (int):
+            Number of nodes.
+        source, target, kind (numpy.ndarray):
+            Edge arrays returned by refined_vg_edges.
+    Returns:
+        tuple of numpy.ndarray:
+            (indegree_matrix, outdegree_matrix), both of shape (n, 4).
+            Row i holds the degrees of node i + 1 and the columns follow EDGE_KINDS.
+    """
+    n_kind = len(EDGE_KINDS)
+    in_idx = (target - 1) * n_kind + kind
+    out_idx = (source - 1) * n_kind + kind
+    indegree_matrix = np.bincount(in_idx, minlength=n * n_kind).reshape(n, n_kind)
+    outdegree_matrix = np.bincount(out_idx, minlength=n * n_kind).reshape(n, n_kind)
+    return indegree_matrix, outdegree_matrix
+
+
+# Order of the edge kinds in the in/out degree vectors.
+# An out-degree vector is compared with the in-degree vector of the time-reversed series.
+IN_PATTERN_ORDER = (0, 1, 2, 3)
+OUT_PATTERN_ORDER = (2, 3, 0, 1)
+
+
+def pattern_radix(window_width):
+    """Returns the radix which packs a degree vector into an integer without collision.
+
+    Each degree of a kind is at most window_width. The radix is kept at 10 for
+    window_width < 10, so that the codes read as the degree vector in decimal.
+    """
+    return max(10, window_width + 1)
+
+
+def encode_patterns(degree_matrix, radix, order=IN_PATTERN_ORDER):
+    """Packs every row of a degree matrix into an integer pattern code.
+
+    Args:
+        degree_matrix (numpy.ndarray):
+            Degree matrix of shape (..., 4) whose columns follow EDGE_KINDS.
+        radix (int):
+            Radix of the codes, see pattern_radix.
+        order (tuple of int):
+            Columns of the degree vector from the most significant digit.
+    Returns:
+        numpy.ndarray: pattern codes of shape (...,).
+    """
+    degree_matrix = np.asarray(degree_matrix)
+    pattern_codes = np.zeros(degree_matrix.shape[:-1], dtype=np.int64)
+    for col in order:
+        pattern_codes = pattern_codes * radix + degree_matrix[..., col]
+    return pattern_codes
+
+
+def decode_patterns(pattern_codes, radix):
+    """Unpacks pattern codes into degree vectors ordered as in encode_patterns.
+
+    Returns:
+        list of tuple: one degree vector per code.
+    """
+    pattern_codes = np.asarray(pattern_codes, dtype=np.int64)
+    digits = [(pattern_codes // radix ** i) % radix for i in reversed(range(len(EDGE_KINDS)))]
+    return list(zip(*(d.tolist() for d in digits)))
@@ -1,19 +1,22 @@
-import networkx as nx
+import numpy as np
 from ts2vg import NaturalVisibilityGraph
 
 from ._base_graphs import BaseGraph
 
 
 class EfficientVisibilityGraph(BaseGraph):
-    def __init__(self, time_series, name, window_width):
+    def __init__(self, time_series, name, window_width, cache=None):
         self.window_width = window_width
+        self.cache = cache
         super().__init__(time_series, name)
 
-    def make_graph(self):
-        vg = NaturalVisibilityGraph([i[1] for i in self.ts])
-        G = nx.DiGraph()
-        node_dic = [(node[0], {"value": node[1]}) for node in self.ts]
-        G.add_nodes_from(node_dic)
+    def make_edges(self):
+        values = self.values
+        if self.cache is not None:
+            arrays = self.cache.load(values, "EfficientVisibilityGraph", self.window_width)
+            if arrays is not None:
+                return arrays["source"], arrays["target"]
+        vg = NaturalVisibilityGraph(values.tolist())
         if self.window_width is None:
             edge_list = [sorted([d + 1 for d in edge]) for edge in vg.edgelist()]
         else:
@@ -23,5 +26,11 @@ class EfficientVisibilityGraph(BaseGraph):
                 if abs(edge[0] - edge[1]) <= self.window_width
             ]
         del vg
-        G.add_edges_from(edge_list)
-        return G
+        # Duplicated pairs are kept once as in the networkx graph.
+        edge_array = np.unique(np.array(edge_list, dtype=np.int64).reshape(-1, 2), axis=0)
+        source, target = edge_array[:, 0], edge_array[:, 1]
+        if self.cache is not None:
+            self.cache.save(
+                values, "EfficientVisibilityGraph", self.window_width, source=source, target=target
+            )
+        return source, target
@@ -0,0 +1,89 @@
+from collections import deque
+
+import numpy as np
+
+from tools.convenient_functions import RollingKLD
+
+from ._edges import (
+    EDGE_KINDS,
+    IN_PATTERN_ORDER,
+    OUT_PATTERN_ORDER,
+    encode_patterns,
+    pattern_radix,
+    refined_last_node_kinds,
+)
+
+
+class OnlineRefinedVG:
+    def __init__(self, window_width, period_length, name="online DVG"):
+        """Refined visibility graph which grows by one node at a time.
+
+        A new node only connects to the last window_width nodes, so only their values
+        and out-degrees are kept, together with the pattern codes of the current period.
+        After N values have been appended, `value` equals
+        RefinedVG(values, window_width=window_width)
+        .rolling_irreversibility(period_length).iloc[N - 1].
+
+        Args:
+            window_width (int):
+                Maximum time lag between two connected nodes.
+            period_length (int):
+                Length of the period of the irreversibility, larger than window_width.
+            name (str):
+                Name of the graph.
+        """
+        if period_length <= window_width:
+            raise ValueError("period_length should be larger than window_width")
+        self.window_width = window_width
+        self.period_length = period_length
+        self.name = name
+        self.N = 0
+        self.radix = pattern_radix(window_width)
+        self.values = deque(maxlen=window_width + 1)
+        # Out-degrees of the last window_width + 1 nodes, node t at row t % (window_width + 1).
+        self.outdegree_matrix = np.zeros((window_width + 1, len(EDGE_KINDS)), dtype=np.int64)
+        n_pattern = period_length - window_width
+        self.in_codes = deque(maxlen=n_pattern)
+        self.out_codes = deque(maxlen=n_pattern)
+        self.kld = RollingKLD(n_pattern, n_pattern)
+        self.value = np.nan
+
+    def append(self, value):
+        """Adds a node and returns the irreversibility of the period ending at it.
+
+        Returns:
+            float: the irreversibility, or NaN until period_length values are appended.
+        """
+        t = self.N
+        w = self.window_width
+        self.values.append(float(value))
+        kind = refined_last_node_kinds(np.array(self.values))
+        connect = kind >= 0
+        source = t - (np.flatnonzero(connect) + 1)
+        indegree = np.bincount(kind[connect], minlength=len(EDGE_KINDS))
+        self.outdegree_matrix[t % (w + 1)] = 0
+        self.outdegree_matrix[source % (w + 1), kind[connect]] += 1
+        self.N += 1
+        if t < w:
+            return self.value
+        # The in-degrees of node t and the out-degrees of node t - window_width are complete now.
+        in_code = encode_patterns(indegree, self.radix, IN_PATTERN_ORDER).item()
+        out_code = encode_patterns(
+            self.outdegree_matrix[(t - w) % (w + 1)], self.radix, OUT_PATTERN_ORDER
+        ).item()
+        # Slide the period by one node in the same order as RefinedVG.rolling_irreversibility.
+        if t >= self.period_length:
+            self.kld.update(self.in_codes[0], p_diff=-1)
+        self.kld.update(in_code, p_diff=1)
+        if t >= self.period_length:
+            self.kld.update(self.out_codes[0], q_diff=-1)
+        self.kld.update(out_code, q_diff=1)
+        self.in_codes.append(in_code)
+        self.out_codes.append(out_code)
+        if t >= self.period_length - 1:
+            self.value = self.kld.value
+        return self.value
+
+    def extend(self, values):
+        """Appends every value and returns the irreversibility after each of them."""
+        return np.array([self.append(value) for value in values])
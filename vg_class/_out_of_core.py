@@ -0,0 +1,138 @@
+from collections import defaultdict
+
+import numpy as np
+
+from tools.convenient_functions import KLD
+
+from ._edges import (
+    IN_PATTERN_ORDER,
+    OUT_PATTERN_ORDER,
+    encode_patterns,
+    pattern_radix,
+    refined_degree_matrices,
+    refined_vg_edges,
+)
+
+
+class OutOfCoreRefinedVG:
+    def __init__(
+        self,
+        time_series,
+        name="temporal DVG",
+        window_width=10,
+        chunk_size=2 ** 20,
+        method="direct",
+        dtype=np.float64,
+    ):
+        """Refined visibility graph of a series read chunk by chunk from the disk.
+
+        Only chunk_size + 2 * window_width values and the pattern histograms are held
+        in memory at a time, and no edge is kept. compute_irreversibility() equals that
+        of RefinedVG(time_series, window_width=window_width).
+
+        Args:
+            time_series (array-like object or str):
+                The original time series, e.g. a numpy.memmap, or the path of a .npy
+                file or of a raw binary file of dtype.
+            name (str):
+                Name of the graph.
+            window_width (int):
+                Maximum time lag between two connected nodes.
+            chunk_size (int):
+                Number of nodes whose patterns are counted per chunk.
+            method (str):
+                See refined_vg_edges.
+            dtype (numpy.dtype):
+                dtype of a raw binary file.
+        """
+        if isinstance(time_series, str):
+            if time_series.endswith(".npy"):
+                time_series = np.load(time_series, mmap_mode="r")
+            else:
+                time_series = np.memmap(time_series, dtype=dtype, mode="r")
+        self.time_series = time_series
+        self.name = name
+        self.N = len(time_series)
+        self.window_width = window_width
+        self.chunk_size = chunk_size
+        self.method = method
+
+    def iter_pattern_codes(self):
+        """Yields the in/out pattern codes of every chunk of nodes.
+
+        The degrees of the nodes lo..hi - 1 depend on the edges from lo - window_width
+        to hi - 1 + window_width, so each chunk is read with window_width values of
+        overlap on both sides and its pattern codes are the same as in RefinedVG.
+
+        Yields:
+            tuple: (lo, in_codes, out_codes) of the nodes lo..lo + len(codes) - 1,
+            counted from 0. Both are trimmed as in RefinedVG.get_pattern_dict.
+        """
+        w = self.window_width
+        radix = pattern_radix(w)
+        for lo in range(0, self.N, self.chunk_size):
+            hi = min(lo + self.chunk_size, self.N)
+            seg_lo, seg_hi = max(lo - w, 0), min(hi + w, self.N)
+            segment = np.asarray(self.time_series[seg_lo:seg_hi], dtype=np.float64)
+            indegree_matrix, outdegree_matrix = refined_degree_matrices(
+                seg_hi - seg_lo, *refined_vg_edges(segment, w, self.method)
+            )
+            in_lo, out_hi = max(lo, w), min(hi, self.N - w)
+            in_codes = encode_patterns(
+                indegree_matrix[in_lo - seg_lo : hi - seg_lo], radix, IN_PATTERN_ORDER
+            )
+            out_codes = encode_patterns(
+                outdegree_matrix[lo - seg_lo : max(out_hi - seg_lo, lo - seg_lo)],
+                radix,
+                OUT_PATTERN_ORDER,
+            )
+            yield lo, in_codes, out_codes
+
+    def get_pattern_dicts(self):
+        """Counts the in/out patterns in a single pass over the series.
+
+        Returns:
+            tuple of defaultdict:
+                (inpattern_dict, outpattern_dict) ordered as in get_pattern_dict,
+                i.e. by descending count and then by first appearance.
+        """
+        counter_list = [{}, {}]
+        for lo, in_codes, out_codes in self.iter_pattern_codes():
+            for counter, codes, start in [
+                (counter_list[0], in_codes, max(lo, self.window_width)),
+                (counter_list[1], out_codes, lo),
+            ]:
+                keys, first_idx, counts = np.unique(codes, return_index=True, return_counts=True)
+                for key, first, count in zip(
+                    keys.tolist(), (first_idx + start).tolist(), counts.tolist()
+                ):
+                    if key in counter:
+                        counter[key][0] += count
+                    else:
+                        counter[key] = [count, first]
+        # pandas value_counts sorts the counts stably from the order of first appearance.
+        return tuple(
+            defaultdict(
+                lambda: 0,
+                {
+                    key: count
+                    for key, (count, _) in sorted(
+                        counter.items(), key=lambda item: (-item[1][0], item[1][1])
+                    )
+                },
+            )
+            for counter in counter_list
+        )
+
+    def get_pattern_dict(self, deg_kind):
+        inpattern_dict, outpattern_dict = self.get_pattern_dicts()
+        if deg_kind == "indegree":
+            return inpattern_dict
+        elif deg_kind == "outdegree":
+            return outpattern_dict
+        raise ValueError("deg_kind should either be indegree or outdegree")
+
+    def compute_irreversibility(self):
+        inpattern_dict, outpattern_dict = self.get_pattern_dicts()
+        kld = KLD(inpattern_dict, outpattern_dict)
+        return kld
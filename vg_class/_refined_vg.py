@@ -1,60 +1,135 @@
-from collections import Counter, defaultdict
+from collections import defaultdict
 
 import matplotlib.pyplot as plt
-import networkx as nx
+import numpy as np
 import pandas as pd
 
-from tools.convenient_functions import KLD
+from tools.convenient_functions import KLD, RollingKLD, aligned_counts, array_KLD
+from tools.parallel import parallel_map
+from tools.profiling import profiled
 from tools.save import save_dir
 
 from ._base_graphs import BaseGraph
+from ._edges import (
+    EDGE_KINDS,
+    IN_PATTERN_ORDER,
+    OUT_PATTERN_ORDER,
+    decode_patterns,
+    encode_patterns,
+    pattern_radix,
+    refined_block_degrees,
+    refined_degree_batch,
+    refined_degree_matrices,
+    refined_vg_edges,
+)
 
 plt.rcParams["font.size"] = 15
 plt.rcParams["axes.formatter.use_mathtext"] = True
 
 
 class RefinedVG(BaseGraph):
-    def __init__(self, time_series, name="temporal DVG", window_width=10):
+    def __init__(
+        self, time_series, name="temporal DVG", window_width=10, cache=None, method="direct"
+    ):
         self.window_width = window_width
+        self.cache = cache
+        # 'slope' makes the edges in O(N * window_width), see refined_slope_kinds.
+        self.method = method
+        # The degree matrices outlive release(), so that the patterns need no rebuild.
+        self._degree_matrices = None
         super().__init__(time_series, name)
 
+    @profiled("make_graph")
     def make_graph(self):
-        # Initialize directed graph.
-        G = nx.DiGraph()
-        # Add all nodes to the graph.
-        node_dic = [(node[0], {"value": node[1]}) for node in self.ts]
-        G.add_nodes_from(node_dic)
-        # Check neighbors from every node.
-        # The size of iteration here is len(time_series).
-        for (ta, ya) in self.ts:
-            # The size of iteration here is window_width.
-            for i in range(min(self.window_width, len(self.ts) - ta)):
-                tb = ta + i + 1
-                yb = self.ts[tb - 1][1]
-                slope = (yb - ya) / (i + 1)
-                real_sequence = [self.ts[ta + j][1] for j in range(i)]
-                line_sequence = [ya + (slope * j) for j in range(1, i + 1)]
-                # Check each conditions.
-                isRise = slope > 0
-                isFall = slope <= 0
-                isVisible = all(
-                    real < line
-                    for real, line in zip(real_sequence, line_sequence)
-                )
-                isInvisible = all(
-                    # real > line
-                    real >= line
-                    for real, line in zip(real_sequence, line_sequence)
-                )
-                if isVisible | isInvisible:
-                    G.add_edge(
-                        ta,
-                        tb,
-                        edge_kind=self.ret_edge_kind(
-                            isRise, isFall, isVisible, isInvisible
-                        ),
-                    )
-        return G
+        # Only the edge arrays and the degree matrices are computed here.
+        # The networkx graph is built on the first access to `graph`.
+        counted = self._degree_matrices is not None
+        self.set_edges(*self.make_edges(), degree_matrices=self._degree_matrices)
+        if self.cache is not None and not counted:
+            # Both methods give exactly the same edges, so they share the cache entries.
+            self.cache.save(
+                self.values,
+                "RefinedVG",
+                self.window_width,
+                indegree_matrix=self.indegree_matrix,
+                outdegree_matrix=self.outdegree_matrix,
+            )
+
+    def load_degrees(self):
+        """Loads the degree matrices from the cache, or makes the edges to count them.
+
+        Only the (N, 4) degree matrices are cached; the edges are made on their first
+        access, e.g. for the networkx graph.
+        """
+        arrays = None
+        if self.cache is not None:
+            arrays = self.cache.load(self.values, "RefinedVG", self.window_width)
+        if arrays is None:
+            self.build()
+        else:
+            self._degree_matrices = (arrays["indegree_matrix"], arrays["outdegree_matrix"])
+        return self
+
+    def make_edges(self):
+        return refined_vg_edges(self.values, self.window_width, self.method)
+
+    def set_edges(self, source, target, kind, degree_matrices=None):
+        super().set_edges(source, target, kind)
+        if degree_matrices is None:
+            degree_matrices = refined_degree_matrices(self.N, *self.edges)
+        self._degree_matrices = degree_matrices
+
+    def build_degrees(self, chunk_size=2 ** 20, n_workers=None, use_threads=True):
+        """Counts the degree matrices block by block without keeping any edge.
+
+        The series is split into blocks of chunk_size source nodes, each extended by
+        window_width nodes (the halo) so that all its out-edges are found. Every edge
+        is counted once by the block of its source, so the stitched matrices are exactly
+        those of build(). The patterns and the irreversibility then need no edge;
+        the edges are still made on their first access.
+
+        Args:
+            chunk_size (int):
+                Number of source nodes per block.
+            n_workers (int or None):
+                Number of workers, see tools.parallel.parallel_map.
+            use_threads (bool):
+                Whether to use threads, which share the series, rather than processes.
+        Returns:
+            RefinedVG: the graph itself.
+        """
+        w = self.window_width
+        block_start_list = range(0, self.N, chunk_size)
+        task_list = [
+            (
+                self.values[lo : min(lo + chunk_size + w, self.N)],
+                min(chunk_size, self.N - lo),
+                w,
+                self.method,
+            )
+            for lo in block_start_list
+        ]
+        result_list = parallel_map(refined_block_degrees, task_list, n_workers, use_threads)
+        indegree_matrix = np.zeros((self.N, len(EDGE_KINDS)), dtype=np.int32)
+        outdegree_matrix = np.zeros((self.N, len(EDGE_KINDS)), dtype=np.int32)
+        for lo, (block_indegree, block_outdegree) in zip(block_start_list, result_list):
+            # The halo adds the in-edges from this block to the first nodes of the next one.
+            indegree_matrix[lo : lo + len(block_indegree)] += block_indegree
+            outdegree_matrix[lo : lo + len(block_outdegree)] = block_outdegree
+        self._degree_matrices = (indegree_matrix, outdegree_matrix)
+        return self
+
+    @property
+    def indegree_matrix(self):
+        if self._degree_matrices is None:
+            self.load_degrees()
+        return self._degree_matrices[0]
+
+    @property
+    def outdegree_matrix(self):
+        if self._degree_matrices is None:
+            self.load_degrees()
+        return self._degree_matrices[1]
 
     def ret_edge_kind(self, isRise, isFall, isVisible, isInvisible):
         if isRise & isVisible:
@@ -68,62 +143,51 @@ class RefinedVG(BaseGraph):
         else:
             raise ValueError
 
+    @profiled("get_degree_sequence")
     def get_degree_sequence(self, *, edge_kind, deg_kind):
-        kind_edge_list = [
-            (f, t)
-            for f, t, prop in self.graph.edges.data()
-            if prop["edge_kind"] == edge_kind
-        ]
-        if len(kind_edge_list) == 0:
-            degree_sequence = {i: 0 for i in range(1, self.N + 1)}
+        kind_idx = EDGE_KINDS.index(edge_kind)
+        if deg_kind == "degree":
+            degrees = (
+                self.indegree_matrix[:, kind_idx]
+                + self.outdegree_matrix[:, kind_idx]
+            )
+        elif deg_kind == "indegree":
+            degrees = self.indegree_matrix[:, kind_idx]
+        elif deg_kind == "outdegree":
+            degrees = self.outdegree_matrix[:, kind_idx]
         else:
-            outdegrees, indegrees = zip(*kind_edge_list)
-            if deg_kind == "degree":
-                degree_sequence = Counter(indegrees) + Counter(outdegrees)
-            elif deg_kind == "indegree":
-                degree_sequence = Counter(indegrees)
-            elif deg_kind == "outdegree":
-                degree_sequence = Counter(outdegrees)
-            else:
-                raise ValueError(
-                    "deg_kind should either be degree, indegree or outdegree"
-                )
-            degree_sequence = {
-                i: degree_sequence[i] for i in range(1, self.N + 1)
-            }
+            raise ValueError(
+                "deg_kind should either be degree, indegree or outdegree"
+            )
+        degree_sequence = dict(zip(range(1, self.N + 1), degrees.tolist()))
         return degree_sequence
 
+    @profiled("get_pattern_sequence_table")
     def get_pattern_sequence_table(self, deg_kind):
-        pattern_sequence_table = pd.concat(
-            [
-                pd.Series(
-                    self.get_degree_sequence(
-                        edge_kind=edge_kind, deg_kind=deg_kind
-                    ),
-                    name=edge_kind,
-                )
-                for edge_kind in ["RV", "RIV", "FV", "FIV"]
-            ],
-            axis=1,
+        if deg_kind == "indegree":
+            degree_matrix, order = self.indegree_matrix, IN_PATTERN_ORDER
+        elif deg_kind == "outdegree":
+            degree_matrix, order = self.outdegree_matrix, OUT_PATTERN_ORDER
+        pattern_sequence_table = pd.DataFrame(
+            degree_matrix, index=range(1, self.N + 1), columns=EDGE_KINDS
         )
-        pattern_sequence_table.loc[
-            :, "pattern_code"
-        ] = pattern_sequence_table.apply(
-            self.to_pattern, axis=1, deg_kind=deg_kind
+        pattern_sequence_table["pattern_code"] = encode_patterns(
+            degree_matrix, pattern_radix(self.window_width), order
         )
         return pattern_sequence_table
 
     def to_pattern(self, data, deg_kind):
         if deg_kind == "indegree":
-            pattern_code = int(
-                data.RV * 1e3 + data.RIV * 1e2 + data.FV * 1e1 + data.FIV
-            )
+            degree_vector = (data.RV, data.RIV, data.FV, data.FIV)
         elif deg_kind == "outdegree":
-            pattern_code = int(
-                data.FV * 1e3 + data.FIV * 1e2 + data.RV * 1e1 + data.RIV
-            )
+            degree_vector = (data.FV, data.FIV, data.RV, data.RIV)
+        radix = pattern_radix(self.window_width)
+        pattern_code = 0
+        for degree in degree_vector:
+            pattern_code = pattern_code * radix + int(degree)
         return pattern_code
 
+    @profiled("get_pattern_dict")
     def get_pattern_dict(self, deg_kind, start=None, end=None):
         pattern_seq = self.get_pattern_sequence_table(
             deg_kind=deg_kind
@@ -155,6 +219,164 @@ class RefinedVG(BaseGraph):
         kld = KLD(inpattern_dict, outpattern_dict)
         return kld
 
+    def irreversibility_by_prefix(self, N_list):
+        """Computes RefinedSubGraph(self, N).compute_irreversibility() for every N in N_list.
+
+        get_pattern_dict leaves out the indegrees of the first window_width nodes
+        and the outdegrees of the last window_width nodes. The remaining nodes of
+        a prefix never lose an edge to the truncation, so their patterns are
+        those of the whole graph and the histograms only grow with N.
+
+        Args:
+            N_list (list of int):
+                Lengths of the prefixes.
+        Returns:
+            dict: irreversibility of each length.
+        """
+        if min(N_list) < 1 or max(N_list) > self.N:
+            raise ValueError(f"N should be between 1 and {self.N}")
+        w = self.window_width
+        in_codes = self.get_pattern_sequence_table("indegree").pattern_code.values
+        out_codes = self.get_pattern_sequence_table("outdegree").pattern_code.values
+        _, pattern_idx = np.unique(
+            np.concatenate([in_codes, out_codes]), return_inverse=True
+        )
+        n_pattern = pattern_idx.max() + 1
+        in_idx, out_idx = pattern_idx[: self.N], pattern_idx[self.N :]
+        in_hist = np.zeros(n_pattern, dtype=np.int64)
+        out_hist = np.zeros(n_pattern, dtype=np.int64)
+        kld_dict = {}
+        in_end, out_end = w, 0
+        for N in sorted(set(N_list)):
+            in_hist += np.bincount(in_idx[in_end:N], minlength=n_pattern)
+            out_hist += np.bincount(out_idx[out_end : max(N - w, 0)], minlength=n_pattern)
+            in_end, out_end = max(in_end, N), max(out_end, N - w)
+            appears = (in_hist > 0) | (out_hist > 0)
+            kld_dict[N] = array_KLD(in_hist[appears], out_hist[appears])
+        return {N: kld_dict[N] for N in N_list}
+
+    def irreversibility_by_omega(self, max_omega):
+        """Computes RefinedVG(ts, window_width=w).compute_irreversibility() for w = 1..max_omega.
+
+        An edge (a, b) and its kind do not depend on window_width as long as
+        b - a <= window_width, so the graphs of smaller window widths are nested.
+        The edges are made once with window_width=max_omega, or taken from this
+        graph if it is wide enough, and the degree matrices of each w are counted
+        cumulatively lag by lag.
+
+        Args:
+            max_omega (int):
+                The largest window width.
+        Returns:
+            dict: irreversibility of each window width.
+        """
+        if max_omega < 1:
+            raise ValueError("max_omega should be 1 or larger")
+        if max_omega <= self.window_width:
+            source, target, kind = self.edges
+        else:
+            source, target, kind = refined_vg_edges(self.values, max_omega, self.method)
+        lag = target - source
+        order = np.argsort(lag, kind="stable")
+        lag_end = np.searchsorted(lag[order], np.arange(1, max_omega + 1), side="right")
+        n_kind = len(EDGE_KINDS)
+        in_idx = ((target - 1) * n_kind + kind)[order]
+        out_idx = ((source - 1) * n_kind + kind)[order]
+        indegree_matrix = np.zeros((self.N, n_kind), dtype=np.int64)
+        outdegree_matrix = np.zeros((self.N, n_kind), dtype=np.int64)
+        kld_dict = {}
+        lag_start = 0
+        for w in range(1, max_omega + 1):
+            edges = slice(lag_start, lag_end[w - 1])
+            indegree_matrix += np.bincount(in_idx[edges], minlength=self.N * n_kind).reshape(
+                self.N, n_kind
+            )
+            outdegree_matrix += np.bincount(out_idx[edges], minlength=self.N * n_kind).reshape(
+                self.N, n_kind
+            )
+            lag_start = lag_end[w - 1]
+            # Count the patterns with the radix and the trimming of get_pattern_dict.
+            radix = pattern_radix(w)
+            in_seq = pd.Series(encode_patterns(indegree_matrix, radix, IN_PATTERN_ORDER))
+            out_seq = pd.Series(encode_patterns(outdegree_matrix, radix, OUT_PATTERN_ORDER))
+            kld_dict[w] = KLD(
+                defaultdict(lambda: 0, in_seq.iloc[w:].value_counts().to_dict()),
+                defaultdict(lambda: 0, out_seq.iloc[:-w].value_counts().to_dict()),
+            )
+        return kld_dict
+
+    @classmethod
+    def batch_irreversibility(cls, series_batch, window_width=10, batch_size=1000):
+        """Computes RefinedVG(ts, window_width=window_width).compute_irreversibility()
+        for every row of series_batch without building any graph.
+
+        Args:
+            series_batch (array-like object):
+                Time series of the same length, of shape (n_series, N).
+            window_width (int):
+                Maximum time lag between two connected nodes.
+            batch_size (int):
+                Number of series processed at once, which bounds the memory.
+        Returns:
+            numpy.ndarray: irreversibility of each series, of shape (n_series,).
+        """
+        series_batch = np.atleast_2d(series_batch)
+        w = window_width
+        radix = pattern_radix(w)
+        kld_list = []
+        for i in range(0, len(series_batch), batch_size):
+            indegree_matrix, outdegree_matrix = refined_degree_batch(
+                series_batch[i : i + batch_size], w
+            )
+            n = indegree_matrix.shape[1]
+            in_codes = encode_patterns(indegree_matrix[:, w:], radix, IN_PATTERN_ORDER)
+            out_codes = encode_patterns(
+                outdegree_matrix[:, : max(n - w, 0)], radix, OUT_PATTERN_ORDER
+            )
+            kld_list.append(array_KLD(*aligned_counts(in_codes, out_codes)))
+        return np.concatenate(kld_list)
+
+    def rolling_irreversibility(self, period_length, index=None):
+        """Computes compute_irreversibility(start=i, end=i + period_length) for every i.
+
+        The pattern codes are computed once and the in/out pattern histograms
+        slide by one node per step, so that the whole sequence costs O(N).
+
+        Args:
+            period_length (int):
+                Length of each period.
+            index (array-like object):
+                Index of the returned series, the node labels by default.
+        Returns:
+            pandas.Series:
+                The irreversibility of each period placed at its last node.
+                The first period_length - 1 nodes are NaN. A period of at most
+                window_width nodes has no pattern, hence 0 as with compute_irreversibility.
+        """
+        if index is None:
+            index = range(1, self.N + 1)
+        in_codes = self.get_pattern_sequence_table("indegree").pattern_code.tolist()
+        out_codes = self.get_pattern_sequence_table("outdegree").pattern_code.tolist()
+        w = self.window_width
+        n_pattern = period_length - w
+        tir_seq = np.full(self.N, np.nan)
+        if n_pattern <= 0:
+            tir_seq[period_length - 1 :] = 0.0
+        elif period_length <= self.N:
+            kld = RollingKLD(n_pattern, n_pattern)
+            for t in range(n_pattern):
+                kld.update(in_codes[w + t], p_diff=1)
+                kld.update(out_codes[t], q_diff=1)
+            tir_seq[period_length - 1] = kld.value
+            for t in range(period_length, self.N):
+                # Slide the periods by one node.
+                kld.update(in_codes[t - n_pattern], p_diff=-1)
+                kld.update(in_codes[t], p_diff=1)
+                kld.update(out_codes[t - period_length], q_diff=-1)
+                kld.update(out_codes[t - w], q_diff=1)
+                tir_seq[t] = kld.value
+        return pd.Series(tir_seq, index=index, name="TIR")
+
     def visualize_in_out_diff(self, dir_path=None, file_name=None):
         inpattern_dict = self.get_pattern_dict("indegree")
         outpattern_dict = self.get_pattern_dict("outdegree")
@@ -169,7 +391,12 @@ class RefinedVG(BaseGraph):
         )
         plt.ylabel("degree vector")
         plt.xlabel(r"Probability difference; $P(v)-P_{TR}(v)$")
-        pd.Series(diff_dict).sort_index().plot.barh()
+        diff_seq = pd.Series(diff_dict).sort_index()
+        diff_seq.index = pd.Index(
+            decode_patterns(diff_seq.index, pattern_radix(self.window_width)),
+            tupleize_cols=False,
+        )
+        diff_seq.plot.barh()
         plt.grid(True, axis="x")
         # plt.xlim(-0.2, 0.2)
         plt.tight_layout()
@@ -1,98 +1,75 @@
-from itertools import combinations
-
-import networkx as nx
-
 from ._base_graphs import BaseGraph
+from ._edges import EDGE_KINDS, refined_degree_matrices, rise_fall_edges
 
 
-class RiseVisibilityGraph(BaseGraph):
+class FusedRiseFallGraphs:
     def __init__(self, time_series, name, window_width):
-        self.window_width = window_width
-        super().__init__(time_series, name)
+        """Classifies every pair of nodes within window_width once
+        and holds the edges of the four rise/fall (in)visibility graphs.
 
-    def make_graph(self):
-        # Initialize directed graph.
-        G = nx.DiGraph()
-        # Add all nodes to the graph.
-        node_dic = [(node[0], {"value": node[1]}) for node in self.ts]
-        G.add_nodes_from(node_dic)
-        # Check every pair of the nodes and add an array if it's connected.
-        for (ta, ya), (tb, yb) in combinations(self.ts, 2):
-            # Every pair fulfills ta < tb from its construction.
-            if ((tb - ta) <= self.window_width) & (ya < yb):
-                slope = (yb - ya) / (tb - ta)
-                connect = True
-                # Check every node c which is located between a and b.
-                for (tc, yc) in self.ts[ta : tb - 1]:
-                    if yc >= ya + slope * (tc - ta):
-                        connect = False
-                        break
-                if connect:
-                    G.add_edge(ta, tb)
-        return G
-
-
-class FallVisibilityGraph(BaseGraph):
-    def __init__(self, time_series, name, window_width):
+        Args:
+            time_series (array-like object):
+                The original time series.
+            name (str):
+                Name given to the graphs.
+            window_width (int):
+                Maximum time lag between two connected nodes.
+        """
+        self.time_series = time_series
+        self.name = name
         self.window_width = window_width
-        super().__init__(time_series, name)
+        self.N = len(time_series)
+        self.edges = rise_fall_edges(time_series, window_width)
+        # Columns follow EDGE_KINDS, i.e. RV, RIV, FV and FIV.
+        self.indegree_matrix, self.outdegree_matrix = refined_degree_matrices(
+            self.N, *self.edges
+        )
 
-    def make_graph(self):
-        G = nx.DiGraph()
-        node_dic = [(node[0], {"value": node[1]}) for node in self.ts]
-        G.add_nodes_from(node_dic)
-        for (ta, ya), (tb, yb) in combinations(self.ts, 2):
-            if ((tb - ta) <= self.window_width) & (ya > yb):
-                slope = (yb - ya) / (tb - ta)
-                connect = True
-                for (tc, yc) in self.ts[ta : tb - 1]:
-                    if yc >= ya + slope * (tc - ta):
-                        connect = False
-                        break
-                if connect:
-                    G.add_edge(ta, tb)
-        return G
-
-
-class RiseInvisibilityGraph(BaseGraph):
-    def __init__(self, time_series, name, window_width):
-        self.window_width = window_width
-        super().__init__(time_series, name)
+    def get_edges(self, edge_kind):
+        source, target, kind = self.edges
+        is_kind = kind == EDGE_KINDS.index(edge_kind)
+        return source[is_kind], target[is_kind]
 
-    def make_graph(self):
-        G = nx.DiGraph()
-        node_dic = [(node[0], {"value": node[1]}) for node in self.ts]
-        G.add_nodes_from(node_dic)
-        for (ta, ya), (tb, yb) in combinations(self.ts, 2):
-            if ((tb - ta) <= self.window_width) & (ya < yb):
-                slope = (yb - ya) / (tb - ta)
-                connect = True
-                for (tc, yc) in self.ts[ta : tb - 1]:
-                    if yc <= ya + slope * (tc - ta):
-                        connect = False
-                        break
-                if connect:
-                    G.add_edge(ta, tb)
-        return G
-
-
-class FallInvisibilityGraph(BaseGraph):
-    def __init__(self, time_series, name, window_width):
+    def get_graphs(self):
+        return {
+            graph_class.edge_kind: graph_class(
+                self.time_series, self.name, self.window_width, fused=self
+            )
+            for graph_class in [
+                RiseVisibilityGraph,
+                RiseInvisibilityGraph,
+                FallVisibilityGraph,
+                FallInvisibilityGraph,
+            ]
+        }
+
+
+class BaseRiseFallGraph(BaseGraph):
+    edge_kind = None
+
+    def __init__(self, time_series, name, window_width, fused=None):
         self.window_width = window_width
+        # Share the single pass with the other three graphs if given.
+        self.fused = fused
         super().__init__(time_series, name)
 
-    def make_graph(self):
-        G = nx.DiGraph()
-        node_dic = [(node[0], {"value": node[1]}) for node in self.ts]
-        G.add_nodes_from(node_dic)
-        for (ta, ya), (tb, yb) in combinations(self.ts, 2):
-            if ((tb - ta) <= self.window_width) & (ya > yb):
-                slope = (yb - ya) / (tb - ta)
-                connect = True
-                for (tc, yc) in self.ts[ta : tb - 1]:
-                    if yc <= ya + slope * (tc - ta):
-                        connect = False
-                        break
-                if connect:
-                    G.add_edge(ta, tb)
-        return G
+    def make_edges(self):
+        if self.fused is None:
+            self.fused = FusedRiseFallGraphs(self.values, self.name, self.window_width)
+        return self.fused.get_edges(self.edge_kind)
+
+
+class RiseVisibilityGraph(BaseRiseFallGraph):
+    edge_kind = "RV"
+
+
+class FallVisibilityGraph(BaseRiseFallGraph):
+    edge_kind = "FV"
+
+
+class RiseInvisibilityGraph(BaseRiseFallGraph):
+    edge_kind = "RIV"
+
+
+class FallInvisibilityGraph(BaseRiseFallGraph):
+    edge_kind = "FIV"
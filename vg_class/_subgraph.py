@@ -4,23 +4,25 @@ from ._refined_vg import RefinedVG
 
 class BasicSubGraph(BaseGraph):
     def __init__(self, full_graph, N):
-        self.name = full_graph.name
-        self.N = N
-        self.ts = full_graph.ts[:N]
+        # Nothing is sliced until the edges are accessed, see BaseGraph.build.
+        self.full_graph = full_graph
         self.window_width = full_graph.window_width
-        self.graph = full_graph.graph.subgraph(range(1, N + 1))
+        super().__init__(full_graph.values[:N], full_graph.name)
 
-    def make_graph(self):
-        pass
+    def make_edges(self):
+        # Keep the edges of subgraph(range(1, N + 1)). Every edge goes forward in time.
+        edges = self.full_graph.edges
+        in_range = edges[1] <= self.N
+        return tuple(e[in_range] for e in edges)
 
 
 class RefinedSubGraph(RefinedVG):
     def __init__(self, full_graph, N):
-        self.name = full_graph.name
-        self.window_width = full_graph.window_width
-        self.N = N
-        self.ts = full_graph.ts[:N]
-        self.graph = full_graph.graph.subgraph(range(1, N + 1))
+        self.full_graph = full_graph
+        super().__init__(full_graph.values[:N], full_graph.name, full_graph.window_width)
 
-    def make_graph(self):
-        pass
+    def make_edges(self):
+        # Keep the edges of subgraph(range(1, N + 1)).
+        source, target, kind = self.full_graph.edges
+        in_range = target <= self.N
+        return source[in_range], target[in_range], kind[in_range]